@@ -526,7 +526,7 @@ class OrchestratorService:
                                 continue  # Skip to next URL
                         else:
                             # Fallback to old markdown processing
-                            parsed_data = self.html_parser.parse(raw_html, url)
+                            parsed_data = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
                             structured_items = parsed_data.get("structured_items", [])
                             # Add source tracking to items
                             for item in structured_items:
@@ -548,7 +548,7 @@ class OrchestratorService:
                         extracted_data = smart_result.get('extracted_data', {})
                         
                         # Also run traditional HTML parser for structured items
-                        parsed_data = self.html_parser.parse(raw_html, url)
+                        parsed_data = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
                         structured_items = parsed_data.get("structured_items", [])
                         
                         # Merge smart extraction with traditional parsing
@@ -590,7 +590,7 @@ class OrchestratorService:
                                     # Re-run smart extraction on new content
                                     smart_result = UniversalExtractor.extract(raw_html, url, site_type)
                                     extracted_data = smart_result.get('extracted_data', {})
-                                    parsed_data = self.html_parser.parse(raw_html, url)
+                                    parsed_data = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
                                     structured_items = parsed_data.get("structured_items", [])
                                     
                                     if extracted_data:
@@ -735,7 +735,7 @@ class OrchestratorService:
                     try:
                         link_html = await self.scraper.scrape(link_url)
                         if link_html and len(link_html) > 500:
-                            link_parsed = self.html_parser.parse(link_html, link_url)
+                            link_parsed = await asyncio.to_thread(self.html_parser.parse, link_html, link_url)
                             link_items = link_parsed.get("structured_items", [])
                             for item in link_items[:50]:
                                 all_entities.append({
@@ -1024,7 +1024,7 @@ class OrchestratorService:
                         source_entry["raw_html_length"] = len(raw_html)
                         
                         # Step 4: HTML Parsing - Convert to structured text
-                        parsed_data = self.html_parser.parse(raw_html, url)
+                        parsed_data = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
                         text_content = parsed_data.get("text_content", "")
                         
                         # Extract title
@@ -1528,7 +1528,7 @@ class OrchestratorService:
             # STEP 4: Content Extraction
             # ================================================================
             logger.info(f"   📝 Step 4: Extracting content...")
-            parsed_data = self.html_parser.parse(raw_html, url)
+            parsed_data = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
             
             result["extracted_content"] = parsed_data.get("text_content", "")[:15000]
             
@@ -1754,7 +1754,7 @@ class OrchestratorService:
             smart_extracted = smart_result.get('extracted_data', {})
             
             # Also run traditional parser
-            parsed_data = self.html_parser.parse(raw_html, request.url)
+            parsed_data = await asyncio.to_thread(self.html_parser.parse, raw_html, request.url)
             
             # Use smart extracted content if available (cleaner), otherwise fall back to parser
             extracted_content = smart_extracted.get('main_content') or parsed_data.get("text_content", "")[:20000]
@@ -2067,7 +2067,7 @@ Respond ONLY with valid JSON.
                     )
                     
                     if raw_html:
-                        parsed = self.html_parser.parse(raw_html, url)
+                        parsed = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
                         content = parsed.get("text_content", "")
                         
                         # Credibility analysis
@@ -2178,7 +2178,7 @@ Respond ONLY with valid JSON.
                         )
                         
                         if raw_html:
-                            parsed = self.html_parser.parse(raw_html, url)
+                            parsed = await asyncio.to_thread(self.html_parser.parse, raw_html, url)
                             content = parsed.get("text_content", "")[:5000]
                             
                             # Simple stance detection
@@ -5,11 +5,125 @@ Detects site protection BEFORE scraping to select the right strategy.
 
 import aiohttp
 import asyncio
+import json
+import os
 import re
-from typing import Dict, Any, Tuple
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Known High Risk Domains (registered domain -> risk)
+KNOWN_HIGH_RISK = {
+    "linkedin.com": "extreme",
+    "facebook.com": "extreme",
+    "instagram.com": "extreme",
+    "twitter.com": "extreme",
+    "x.com": "extreme",
+    "github.com": "extreme",
+    "ambitionbox.com": "extreme",
+    "glassdoor.com": "extreme",
+    "trustpilot.com": "extreme",
+    "amazon.com": "high",
+    "yelp.com": "high",
+    "tripadvisor.com": "high",
+    "g2.com": "extreme"
+}
+
+
+def _known_risk(domain: str) -> Optional[str]:
+    """
+    Look up a domain (or any parent domain) in KNOWN_HIGH_RISK.
+    
+    Walks the dot-separated suffixes, so "www.linkedin.com" matches
+    "linkedin.com" while "dropbox.com" does not match "x.com".
+    """
+    host = domain.split(":", 1)[0]
+    while host:
+        risk = KNOWN_HIGH_RISK.get(host)
+        if risk:
+            return risk
+        _, _, host = host.partition(".")
+    return None
+
+
+# Signal bits for the risk/strategy lookup tables
+_BIT_BOT_WALL = 0
+_BIT_HARD_WALL = 1
+_BIT_CAPTCHA = 2
+_BIT_RENDERING = 3
+_BIT_REDIRECTS = 4
+_BIT_HTTP_ERROR = 5
+
+_HARD_WALLS = frozenset({'cloudflare', 'akamai', 'datadome'})
+
+# Score contributed by each signal bit
+_SIGNAL_SCORES = {
+    _BIT_BOT_WALL: 40,
+    _BIT_HARD_WALL: 20,
+    _BIT_CAPTCHA: 30,
+    _BIT_RENDERING: 15,
+    _BIT_REDIRECTS: 10,
+    _BIT_HTTP_ERROR: 25,
+}
+
+
+def _risk_from_bits(bits: int) -> str:
+    """Risk level for a signal bitmask."""
+    score = sum(points for bit, points in _SIGNAL_SCORES.items() if bits >> bit & 1)
+    
+    if score >= 70:
+        return "extreme"
+    elif score >= 50:
+        return "high"
+    elif score >= 25:
+        return "medium"
+    else:
+        return "low"
+
+
+def _strategy_from_bits(bits: int) -> str:
+    """Recommended scraping strategy for a signal bitmask."""
+    risk = _risk_from_bits(bits)
+    
+    if risk == "extreme" or bits >> _BIT_CAPTCHA & 1:
+        return "ultra_stealth"
+    elif risk == "high" or bits >> _BIT_BOT_WALL & 1:
+        return "ultra_stealth"
+    elif risk == "medium" or bits >> _BIT_RENDERING & 1:
+        return "stealth"
+    else:
+        return "lightweight"
+
+
+_RISK_TABLE = tuple(_risk_from_bits(bits) for bits in range(1 << len(_SIGNAL_SCORES)))
+_STRATEGY_TABLE = tuple(_strategy_from_bits(bits) for bits in range(1 << len(_SIGNAL_SCORES)))
+
+
+def _known_profile(domain: str, risk: str) -> Dict[str, Any]:
+    """Forced profile for a KNOWN_HIGH_RISK domain ("url" is filled per call)."""
+    return {
+        "url": None,
+        "domain": domain,
+        "risk": risk,
+        "needs_rendering": True,
+        "bot_wall": "known_protection",
+        "captcha_detected": True,
+        "redirect_count": 0,
+        "recommended_strategy": "ultra_stealth" if risk == "extreme" else "stealth",
+        "details": {"reason": "Known high-risk domain"}
+    }
+
 
 class SiteProfiler:
     """
@@ -59,9 +173,141 @@ class SiteProfiler:
         'verify you are human', 'prove you are not a robot'
     ]
     
-    def __init__(self):
-        self.profile_cache: Dict[str, Dict] = {}
-        self.cache_ttl = 3600  # 1 hour
+    # Challenge page indicators (specific to block pages)
+    CHALLENGE_INDICATORS = [
+        'checking your browser before accessing',
+        'please wait while we verify',
+        'this process is automatic',
+        'ray id:',
+        'performance & security by cloudflare'
+    ]
+    
+    # Cache lifetime per risk tier: heavy protection rarely goes away, while
+    # a low-risk verdict is cheap to re-check and more likely to go stale.
+    RISK_CACHE_TTL = {
+        "extreme": 86400,  # 24 hours
+        "high": 21600,     # 6 hours
+        "medium": 3600,    # 1 hour
+        "low": 900,        # 15 minutes
+    }
+    
+    PERSISTENCE_FILE = "app/static/site_profiles.db"
+    
+    # Body bytes read for analysis; block/challenge pages are far smaller
+    MAX_BODY_BYTES = 65536
+    
+    def __init__(self, max_cache_size: int = 4096, persistence_file: Optional[str] = PERSISTENCE_FILE):
+        # Cache: domain -> (monotonic expiry, profile), kept in LRU order
+        self.profile_cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self.cache_ttl = 3600  # 1 hour (default when risk is unknown)
+        self.max_cache_size = max_cache_size
+        
+        # Profiles also persist to sqlite so new processes skip re-probing.
+        # profile() runs disk reads/writes in worker threads, which share
+        # the connection under this lock.
+        self.persistence_file = persistence_file
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        
+        self._preload_known_profiles()
+    
+    def _preload_known_profiles(self):
+        """Pin the KNOWN_HIGH_RISK profiles (and www. variants) into the cache."""
+        for known, risk in KNOWN_HIGH_RISK.items():
+            for domain in (known, f"www.{known}"):
+                self._store_in_cache(domain, _known_profile(domain, risk), ttl=float("inf"))
+    
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        """Open the persistent profile store on first use."""
+        if self._db is None and self.persistence_file:
+            try:
+                os.makedirs(os.path.dirname(self.persistence_file) or ".", exist_ok=True)
+                self._db = sqlite3.connect(self.persistence_file, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS profiles "
+                    "(domain TEXT PRIMARY KEY, expires REAL NOT NULL, profile BLOB NOT NULL)"
+                )
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"[Profiler] Persistent cache disabled: {e}")
+                self._db = None
+                self.persistence_file = None
+        return self._db
+    
+    def _load_from_disk(self, domain: str) -> Optional[Tuple[Dict, float]]:
+        """
+        Return (profile, seconds left) for a persisted, unexpired profile.
+        Blocking; profile() runs it in a worker thread.
+        """
+        with self._db_lock:
+            db = self._get_db()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT expires, profile FROM profiles WHERE domain = ?", (domain,)
+                ).fetchone()
+            except Exception as e:
+                logger.debug(f"[Profiler] Could not read persisted profile for {domain}: {e}")
+                return None
+        if row is None:
+            return None
+        expires, data = row
+        remaining = expires - time.time()
+        if remaining <= 0:
+            return None
+        try:
+            profile = orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+        except Exception as e:
+            logger.debug(f"[Profiler] Could not read persisted profile for {domain}: {e}")
+            return None
+        return profile, remaining
+    
+    def _save_to_disk(self, domain: str, profile: Dict):
+        """
+        Persist a profile with its risk-tier TTL.
+        Blocking; profile() runs it in a worker thread.
+        """
+        ttl = self.RISK_CACHE_TTL.get(profile.get("risk"), self.cache_ttl)
+        try:
+            data = orjson.dumps(profile) if ORJSON_AVAILABLE else json.dumps(profile)
+        except Exception as e:
+            logger.debug(f"[Profiler] Could not persist profile for {domain}: {e}")
+            return
+        with self._db_lock:
+            db = self._get_db()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO profiles (domain, expires, profile) VALUES (?, ?, ?)",
+                    (domain, time.time() + ttl, data)
+                )
+                db.commit()
+            except Exception as e:
+                logger.debug(f"[Profiler] Could not persist profile for {domain}: {e}")
+    
+    def _get_cached(self, domain: str) -> Optional[Dict]:
+        """Return a cached profile if present and not expired."""
+        entry = self.profile_cache.get(domain)
+        if entry is None:
+            return None
+        expiry, profile = entry
+        if time.monotonic() >= expiry:
+            # Expired, remove from cache
+            del self.profile_cache[domain]
+            return None
+        self.profile_cache.move_to_end(domain)
+        return profile
+    
+    def _store_in_cache(self, domain: str, profile: Dict, ttl: Optional[float] = None):
+        """Cache a profile with a TTL based on its risk, evicting the LRU entry when full."""
+        if ttl is None:
+            ttl = self.RISK_CACHE_TTL.get(profile.get("risk"), self.cache_ttl)
+        self.profile_cache[domain] = (time.monotonic() + ttl, profile)
+        self.profile_cache.move_to_end(domain)
+        while len(self.profile_cache) > self.max_cache_size:
+            self.profile_cache.popitem(last=False)
     
     async def profile(self, url: str, timeout: int = 10) -> Dict[str, Any]:
         """
@@ -82,51 +328,30 @@ class SiteProfiler:
         """
         domain = urlparse(url).netloc.lower()
         
-        # Check cache first
-        # Check cache first
-        if domain in self.profile_cache:
-            cached = self.profile_cache[domain]
+        # Check cache first (known high-risk domains are preloaded here)
+        cached = self._get_cached(domain)
+        if cached is not None:
             logger.info(f"[Profiler] Using cached profile for {domain}")
-            return cached
+            return {**cached, "url": url}
         
         logger.info(f"[Profiler] Profiling {domain}...")
 
-        # Known High Risk Domains force override
-        KNOWN_HIGH_RISK = {
-             "linkedin.com": "extreme",
-             "facebook.com": "extreme",
-             "instagram.com": "extreme",
-             "twitter.com": "extreme",
-             "x.com": "extreme",
-             "github.com": "extreme",
-             "ambitionbox.com": "extreme",
-             "glassdoor.com": "extreme",
-             "trustpilot.com": "extreme",
-             "amazon.com": "high",
-             "yelp.com": "high",
-             "tripadvisor.com": "high",
-             "g2.com": "extreme"
-        }
-
-        for known, risk in KNOWN_HIGH_RISK.items():
-            if known in domain:
-                logger.info(f"[Profiler] {domain} is a KNOWN {risk} risk site -> Forcing Ultra Stealth")
-                
-                strategy = "ultra_stealth" if risk == "extreme" else "stealth"
-                
-                forced_profile = {
-                    "url": url,
-                    "domain": domain,
-                    "risk": risk,
-                    "needs_rendering": True,
-                    "bot_wall": "known_protection",
-                    "captcha_detected": True,
-                    "redirect_count": 0,
-                    "recommended_strategy": strategy,
-                    "details": {"reason": "Known high-risk domain"}
-                }
-                self.profile_cache[domain] = forced_profile
-                return forced_profile
+        # Other subdomains of known high-risk domains (or preloaded entries
+        # that were evicted) are pinned on first sight
+        risk = _known_risk(domain)
+        if risk:
+            logger.info(f"[Profiler] {domain} is a KNOWN {risk} risk site -> Forcing Ultra Stealth")
+            forced_profile = _known_profile(domain, risk)
+            self._store_in_cache(domain, forced_profile, ttl=float("inf"))
+            return {**forced_profile, "url": url}
+        
+        # Then the persistent cache from earlier runs (sqlite off the event loop)
+        persisted = await asyncio.to_thread(self._load_from_disk, domain)
+        if persisted is not None:
+            persisted_profile, remaining = persisted
+            self._store_in_cache(domain, persisted_profile, ttl=remaining)
+            logger.info(f"[Profiler] Using persisted profile for {domain}")
+            return {**persisted_profile, "url": url}
         
         profile = {
             "url": url,
@@ -154,75 +379,24 @@ class SiteProfiler:
                     'Accept-Language': 'en-US,en;q=0.9'
                 }
                 
-                async with session.get(
-                    url, 
-                    headers=headers, 
-                    timeout=aiohttp.ClientTimeout(total=timeout),
-                    allow_redirects=True,
-                    max_redirects=5
-                ) as response:
-                    profile["details"]["status_code"] = response.status
-                    profile["redirect_count"] = len(response.history)
-                    
-                    # Store relevant headers
-                    for header in ['server', 'x-powered-by', 'cf-ray', 'x-cache']:
-                        if header in response.headers:
-                            profile["details"]["headers"][header] = response.headers[header]
-                    
-                    # Get content for analysis
-                    content = await response.text()
-                    content_lower = content.lower()
-                    headers_str = str(response.headers).lower()
-                    
-                    # Detect bot protection - check HEADERS only for protection signatures
-                    # (many pages mention "cloudflare" in content without being protected)
-                    for protection, signatures in self.BOT_PROTECTION_SIGNATURES.items():
-                        for sig in signatures:
-                            # Only check headers for cloudflare/akamai detection
-                            if sig in headers_str:
-                                profile["bot_wall"] = protection
-                                profile["details"]["protection_signals"].append(f"{sig} (header)")
-                                break
-                        if profile["bot_wall"]:
-                            break
-                    
-                    # Check for challenge page content (these are specific to block pages)
-                    challenge_indicators = [
-                        'checking your browser before accessing',
-                        'please wait while we verify',
-                        'this process is automatic',
-                        'ray id:',
-                        'performance & security by cloudflare'
-                    ]
-                    for indicator in challenge_indicators:
-                        if indicator in content_lower:
-                            profile["bot_wall"] = "cloudflare"
-                            profile["details"]["protection_signals"].append(f"{indicator[:30]}...")
-                            break
-                    
-                    # Detect JS requirements
-                    for framework in self.JS_FRAMEWORKS:
-                        if framework in content_lower:
-                            profile["needs_rendering"] = True
-                            profile["details"]["js_signals"].append(framework)
-                    
-                    # Detect CAPTCHA (only in short content - challenge pages)
-                    for captcha_sig in self.CAPTCHA_SIGNATURES:
-                        if captcha_sig in content_lower and len(content) < 10000:
-                            profile["captcha_detected"] = True
-                            profile["details"]["warnings"].append(f"CAPTCHA detected: {captcha_sig}")
-                            break
-                    
-                    # Check for minimal content (likely JS-rendered)
-                    if len(content) < 5000 and '<noscript>' in content_lower:
-                        profile["needs_rendering"] = True
-                        profile["details"]["warnings"].append("Minimal HTML, likely JS-rendered")
-                    
-                    # Calculate risk level
-                    profile["risk"] = self._calculate_risk(profile)
-                    
-                    # Determine recommended strategy
-                    profile["recommended_strategy"] = self._recommend_strategy(profile)
+                # Fast path: headers alone usually identify the hard walls, in
+                # which case the body is never downloaded
+                if not await self._profile_from_head(session, url, headers, profile):
+                    async with session.get(
+                        url, 
+                        headers=headers, 
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                        allow_redirects=True,
+                        max_redirects=5
+                    ) as response:
+                        self._record_response(response, profile)
+                        await self._analyze_body(response, profile)
+                
+                # Calculate risk level
+                profile["risk"] = self._calculate_risk(profile)
+                
+                # Determine recommended strategy
+                profile["recommended_strategy"] = self._recommend_strategy(profile)
                     
         except asyncio.TimeoutError:
             profile["details"]["warnings"].append("Profile timeout - assuming high risk")
@@ -233,62 +407,209 @@ class SiteProfiler:
             profile["risk"] = "medium"
             profile["recommended_strategy"] = "stealth"
         
-        # Cache the profile
-        self.profile_cache[domain] = profile
+        # Cache the profile (only persist real responses, not timeouts/errors)
+        self._store_in_cache(domain, profile)
+        if profile["details"]["status_code"] is not None:
+            await asyncio.to_thread(self._save_to_disk, domain, profile)
         
         logger.info(f"[Profiler] {domain}: risk={profile['risk']}, strategy={profile['recommended_strategy']}")
         return profile
     
-    def _calculate_risk(self, profile: Dict) -> str:
-        """Calculate risk level based on detected signals."""
-        score = 0
+    def _record_response(self, response, profile: Dict):
+        """Record status, redirects and the relevant headers of a response."""
+        profile["details"]["status_code"] = response.status
+        profile["redirect_count"] = len(response.history)
         
-        if profile["bot_wall"]:
-            score += 40
-            if profile["bot_wall"] in ['cloudflare', 'akamai', 'datadome']:
-                score += 20
+        # Store relevant headers
+        for header in ['server', 'x-powered-by', 'cf-ray', 'x-cache']:
+            if header in response.headers:
+                profile["details"]["headers"][header] = response.headers[header]
+    
+    async def _profile_from_head(self, session, url: str, headers: Dict, profile: Dict) -> bool:
+        """
+        Try to classify the site from a HEAD request alone.
         
-        if profile["captcha_detected"]:
-            score += 30
+        Returns True (with profile filled in) when the headers already show a
+        bot wall that puts the site at high/extreme risk. Returns False when
+        the GET path is still needed: no verdict, HEAD unsupported, or failure.
+        """
+        try:
+            async with session.head(
+                url,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=5),
+                allow_redirects=True,
+                max_redirects=5
+            ) as response:
+                if response.status in (405, 501):
+                    return False
+                
+                detected = self._detect_header_protection(response.headers)
+                if not detected:
+                    return False
+                
+                candidate = {
+                    **profile,
+                    "bot_wall": detected[0],
+                    "redirect_count": len(response.history),
+                    "details": {**profile["details"], "status_code": response.status},
+                }
+                if self._calculate_risk(candidate) not in ("high", "extreme"):
+                    return False
+                
+                self._record_response(response, profile)
+                profile["bot_wall"], sig = detected
+                profile["details"]["protection_signals"].append(f"{sig} (header)")
+                logger.debug(f"[Profiler] Classified {url} from HEAD: {profile['bot_wall']}")
+                return True
+        except Exception as e:
+            logger.debug(f"[Profiler] HEAD probe failed for {url}: {e}")
+            return False
+    
+    async def _read_body(self, response) -> bytes:
+        """Read at most MAX_BODY_BYTES of the response body."""
+        chunks = []
+        remaining = self.MAX_BODY_BYTES
+        while remaining > 0:
+            chunk = await response.content.read(remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+    
+    async def _analyze_body(self, response, profile: Dict):
+        """Detect protection, JS and CAPTCHA signals from a full GET response."""
+        # Get content for analysis (raw bytes: every marker is ASCII, so no
+        # decode or Unicode case folding is needed)
+        content = await self._read_body(response)
+        markers = _scan_markers(content)
+        
+        # Detect bot protection - check HEADERS only for protection signatures
+        # (many pages mention "cloudflare" in content without being protected)
+        detected = self._detect_header_protection(response.headers)
+        if detected:
+            profile["bot_wall"], sig = detected
+            profile["details"]["protection_signals"].append(f"{sig} (header)")
+        
+        # Check for challenge page content (these are specific to block pages)
+        for indicator in self.CHALLENGE_INDICATORS:
+            if indicator in markers:
+                profile["bot_wall"] = "cloudflare"
+                profile["details"]["protection_signals"].append(f"{indicator[:30]}...")
+                break
         
-        if profile["needs_rendering"]:
-            score += 15
+        # Detect JS requirements
+        for framework in self.JS_FRAMEWORKS:
+            if framework.lower() in markers:
+                profile["needs_rendering"] = True
+                profile["details"]["js_signals"].append(framework)
         
-        if profile["redirect_count"] > 2:
-            score += 10
+        # Detect CAPTCHA (only in short content - challenge pages)
+        for captcha_sig in self.CAPTCHA_SIGNATURES:
+            if captcha_sig in markers and len(content) < 10000:
+                profile["captcha_detected"] = True
+                profile["details"]["warnings"].append(f"CAPTCHA detected: {captcha_sig}")
+                break
         
-        if profile["details"]["status_code"] and profile["details"]["status_code"] >= 400:
-            score += 25
+        # Check for minimal content (likely JS-rendered)
+        if len(content) < 5000 and '<noscript>' in markers:
+            profile["needs_rendering"] = True
+            profile["details"]["warnings"].append("Minimal HTML, likely JS-rendered")
+    
+    def _detect_header_protection(self, headers) -> Optional[Tuple[str, str]]:
+        """
+        Match response headers against BOT_PROTECTION_SIGNATURES.
         
-        if score >= 70:
-            return "extreme"
-        elif score >= 50:
-            return "high"
-        elif score >= 25:
-            return "medium"
-        else:
-            return "low"
+        Compares each lowercased header name/value directly instead of
+        rendering the whole header mapping to one string and rescanning it
+        per signature. Returns (protection, signature) or None.
+        """
+        header_items = [(k.lower(), v.lower()) for k, v in headers.items()]
+        for protection, signatures in self.BOT_PROTECTION_SIGNATURES.items():
+            for sig in signatures:
+                for name, value in header_items:
+                    if sig in name or sig in value:
+                        return protection, sig
+        return None
+    
+    @staticmethod
+    def _signal_bits(profile: Dict) -> int:
+        """Pack the detected signals into the bitmask used by the lookup tables."""
+        bot_wall = profile["bot_wall"]
+        return (
+            bool(bot_wall) << _BIT_BOT_WALL
+            | (bot_wall in _HARD_WALLS) << _BIT_HARD_WALL
+            | bool(profile["captcha_detected"]) << _BIT_CAPTCHA
+            | bool(profile["needs_rendering"]) << _BIT_RENDERING
+            | (profile["redirect_count"] > 2) << _BIT_REDIRECTS
+            | ((profile["details"]["status_code"] or 0) >= 400) << _BIT_HTTP_ERROR
+        )
+    
+    def _calculate_risk(self, profile: Dict) -> str:
+        """Calculate risk level based on detected signals."""
+        return _RISK_TABLE[self._signal_bits(profile)]
     
     def _recommend_strategy(self, profile: Dict) -> str:
         """Recommend scraping strategy based on profile."""
-        risk = profile["risk"]
-        
-        if risk == "extreme" or profile["captcha_detected"]:
-            return "ultra_stealth"
-        elif risk == "high" or profile["bot_wall"]:
-            return "ultra_stealth"
-        elif risk == "medium" or profile["needs_rendering"]:
-            return "stealth"
-        else:
-            return "lightweight"
+        return _STRATEGY_TABLE[self._signal_bits(profile)]
     
     def get_cached_profiles(self) -> Dict[str, Dict]:
-        """Return all cached profiles."""
-        return self.profile_cache.copy()
+        """Return all cached (non-expired) profiles."""
+        now = time.monotonic()
+        return {
+            domain: profile
+            for domain, (expiry, profile) in self.profile_cache.items()
+            if now < expiry
+        }
     
     def clear_cache(self):
-        """Clear the profile cache."""
+        """Clear the profile cache, including persisted profiles."""
         self.profile_cache.clear()
+        self._preload_known_profiles()
+        with self._db_lock:
+            db = self._get_db()
+            if db is not None:
+                try:
+                    db.execute("DELETE FROM profiles")
+                    db.commit()
+                except Exception as e:
+                    logger.warning(f"[Profiler] Failed to clear persisted profiles: {e}")
+
+
+def _build_marker_scan(markers):
+    """
+    Compile one case-insensitive bytes pattern that finds every body marker.
+    
+    The pattern is a zero-width lookahead tried at each position with the
+    longest alternatives first, so overlapping markers are all seen. Markers
+    contained in a longer one (e.g. "captcha" in "recaptcha") are implied by
+    it through the returned containment map.
+    """
+    markers = sorted({m.lower() for m in markers}, key=len, reverse=True)
+    pattern = re.compile(
+        b"(?=(" + b"|".join(re.escape(m.encode()) for m in markers) + b"))", re.IGNORECASE
+    )
+    contained = {m: {o for o in markers if o in m} for m in markers}
+    return pattern, contained
+
+
+_MARKER_SCAN, _MARKER_CONTAINED = _build_marker_scan(
+    SiteProfiler.CHALLENGE_INDICATORS
+    + SiteProfiler.JS_FRAMEWORKS
+    + SiteProfiler.CAPTCHA_SIGNATURES
+    + ['<noscript>']
+)
+
+
+def _scan_markers(content: bytes) -> set:
+    """Return the (lowercased) body markers present in content, in one pass."""
+    found = set()
+    for match in _MARKER_SCAN.finditer(content):
+        marker = match.group(1).lower().decode()
+        if marker not in found:
+            found |= _MARKER_CONTAINED[marker]
+    return found
 
 
 # Singleton instance
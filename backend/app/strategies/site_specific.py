@@ -6,14 +6,125 @@ Each site has its own tailored approach based on how its protection works.
 """
 
 import asyncio
+import copy
+import functools
+import inspect
 import random
 import json
 import re
-from typing import Dict, Optional, List
+import time
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Awaitable, Dict, Optional, List
 from datetime import datetime
 from loguru import logger
 from urllib.parse import urlparse, urljoin
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _loads(content):
+    """Parse a JSON body, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _cache_successful(ttl: float = 600, maxsize: int = 2048):
+    """
+    Memoize successful results of an async scraper classmethod.
+    
+    The key is every argument except the class and the scraper instance.
+    Failed results are never cached, so retries still hit the network, and
+    callers get a deep copy so cached results cannot be mutated.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        
+        @functools.wraps(func)
+        async def wrapper(cls, *args, **kwargs):
+            bound = signature.bind(cls, *args, **kwargs)
+            key = tuple(
+                value for name, value in bound.arguments.items()
+                if name not in ("cls", "scraper")
+            )
+            
+            entry = cache.get(key)
+            if entry is not None:
+                expiry, cached = entry
+                if time.monotonic() < expiry:
+                    cache.move_to_end(key)
+                    logger.debug(f"[SiteScraper] Cache HIT for {func.__qualname__}{key}")
+                    return copy.deepcopy(cached)
+                del cache[key]
+            
+            result = await func(cls, *args, **kwargs)
+            if result.get("success"):
+                cache[key] = (time.monotonic() + ttl, copy.deepcopy(result))
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+        
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
+
+
+# URL id extractors
+_ASIN_RE = re.compile(r'/(?:dp|product)/([A-Z0-9]{10})')
+_TWEET_ID_RE = re.compile(r'/status/(\d+)')
+
+
+def _linkedin_username(profile_url: str) -> Optional[str]:
+    """Return the <username> of a linkedin.com/in/<username> URL, if any."""
+    if "linkedin.com/in/" not in profile_url:
+        return None
+    parts = urlparse(profile_url).path.split("/")
+    try:
+        return parts[parts.index("in") + 1] or None
+    except (ValueError, IndexError):
+        return None
+
+
+async def _first_successful(attempts: Dict[str, Awaitable[Optional[Dict]]], tag: str) -> Optional[Dict]:
+    """
+    Run fallback attempts concurrently and return the first successful outcome.
+    
+    Each attempt resolves to a dict of result fields (including "success") or
+    None. Whatever is still running once a winner is found gets cancelled, so
+    wall time is that of the fastest working source rather than the sum of all.
+    """
+    tasks = {asyncio.ensure_future(coro): name for name, coro in attempts.items()}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Keep the declared priority when several finish together
+            for task in (t for t in tasks if t in done):
+                try:
+                    outcome = task.result()
+                except Exception as e:
+                    logger.debug(f"[{tag}] {tasks[task]} failed: {e}")
+                    continue
+                if outcome and outcome.get("success"):
+                    return outcome
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+        # Retrieve the errors of attempts that finished alongside the winner,
+        # and let the cancelled ones unwind, so none is reported as unretrieved
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                task.exception()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
 
 class LinkedInScraper:
     """
@@ -39,6 +150,7 @@ class LinkedInScraper:
     ]
     
     @classmethod
+    @_cache_successful()
     async def scrape_profile(cls, profile_url: str, scraper) -> Dict:
         """
         Scrape LinkedIn profile using fallback strategies.
@@ -51,47 +163,38 @@ class LinkedInScraper:
         }
         
         # Extract username from URL
-        match = re.search(r'linkedin\.com/in/([^/\?]+)', profile_url)
-        if not match:
+        username = _linkedin_username(profile_url)
+        if not username:
             return result
         
-        username = match.group(1)
-        
-        # Strategy 1: Try Google Cache
-        try:
+        async def from_google_cache():
             cache_url = f"https://webcache.googleusercontent.com/search?q=cache:linkedin.com/in/{username}"
             content = await scraper.scrape(cache_url)
             if content and "linkedin" in content.lower():
-                result["data"] = cls._parse_profile_content(content)
-                result["source"] = "google_cache"
-                result["success"] = True
-                return result
-        except Exception as e:
-            logger.debug(f"[LinkedIn] Google cache failed: {e}")
+                return {"data": cls._parse_profile_content(content), "source": "google_cache", "success": True}
         
-        # Strategy 2: Try Bing search results
-        try:
+        async def from_bing():
             bing_url = f"https://www.bing.com/search?q=site:linkedin.com/in/{username}"
             content = await scraper.scrape(bing_url)
             if content:
-                result["data"] = cls._parse_search_results(content, username)
-                result["source"] = "bing_search"
-                result["success"] = bool(result["data"])
-                return result
-        except Exception as e:
-            logger.debug(f"[LinkedIn] Bing search failed: {e}")
+                data = cls._parse_search_results(content, username)
+                return {"data": data, "source": "bing_search", "success": bool(data)}
         
-        # Strategy 3: Try Web Archive
-        try:
+        async def from_web_archive():
             archive_url = f"https://web.archive.org/web/2024/linkedin.com/in/{username}"
             content = await scraper.scrape(archive_url)
             if content:
-                result["data"] = cls._parse_profile_content(content)
-                result["source"] = "web_archive"
-                result["success"] = bool(result["data"])
-                return result
-        except Exception as e:
-            logger.debug(f"[LinkedIn] Web archive failed: {e}")
+                data = cls._parse_profile_content(content)
+                return {"data": data, "source": "web_archive", "success": bool(data)}
+        
+        # Try Google Cache, Bing search results and Web Archive concurrently
+        outcome = await _first_successful({
+            "Google cache": from_google_cache(),
+            "Bing search": from_bing(),
+            "Web archive": from_web_archive(),
+        }, "LinkedIn")
+        if outcome:
+            result.update(outcome)
         
         return result
     
@@ -117,13 +220,19 @@ class LinkedInScraper:
         
         return data
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _headline_re(username: str) -> "re.Pattern":
+        """Compiled search-result headline pattern for a profile username."""
+        return re.compile(rf'{re.escape(username)}[^|]*\|[^-]*-([^<]+)', re.IGNORECASE)
+    
     @classmethod
     def _parse_search_results(cls, content: str, username: str) -> Dict:
         """Parse profile info from search results."""
         data = {}
         
         # Extract from meta descriptions in search results
-        title_match = re.search(rf'{username}[^|]*\|[^-]*-([^<]+)', content, re.IGNORECASE)
+        title_match = cls._headline_re(username).search(content)
         if title_match:
             data["headline"] = title_match.group(1).strip()
         
@@ -154,6 +263,7 @@ class AmazonScraper:
     }
     
     @classmethod
+    @_cache_successful()
     async def scrape_product(cls, product_url: str, scraper) -> Dict:
         """
         Scrape Amazon product with anti-ban strategies.
@@ -165,47 +275,38 @@ class AmazonScraper:
         }
         
         # Extract ASIN
-        asin_match = re.search(r'/dp/([A-Z0-9]{10})', product_url)
-        if not asin_match:
-            asin_match = re.search(r'/product/([A-Z0-9]{10})', product_url)
-        
+        asin_match = _ASIN_RE.search(product_url)
         if not asin_match:
             return result
         
         asin = asin_match.group(1)
         
-        # Strategy 1: Try mobile URL (often less protected)
-        try:
+        async def from_mobile_url():
             mobile_url = f"https://www.amazon.com/dp/{asin}?th=1&psc=1"
             content = await scraper.scrape(
                 mobile_url,
                 force_ultra_stealth=True
             )
             if content and len(content) > 1000:
-                result["data"] = cls._parse_product(content, asin)
-                result["success"] = bool(result["data"].get("title"))
-                return result
-        except Exception as e:
-            logger.debug(f"[Amazon] Mobile URL failed: {e}")
+                data = cls._parse_product(content, asin)
+                return {"data": data, "success": bool(data.get("title"))}
         
-        # Strategy 2: Try price API endpoint
-        try:
-            api_url = f"https://www.amazon.com/gp/product/ajax/get-price/{asin}"
-            # This usually requires cookies but sometimes works
-            pass
-        except:
-            pass
-        
-        # Strategy 3: Search and extract from results
-        try:
+        async def from_search():
             search_url = f"https://www.amazon.com/s?k={asin}"
             content = await scraper.scrape(search_url, force_ultra_stealth=True)
             if content:
-                result["data"] = cls._parse_from_search(content, asin)
-                result["success"] = bool(result["data"].get("title"))
-                return result
-        except Exception as e:
-            logger.debug(f"[Amazon] Search failed: {e}")
+                data = cls._parse_from_search(content, asin)
+                return {"data": data, "success": bool(data.get("title"))}
+        
+        # Mobile URL (often less protected) and search results run concurrently.
+        # The price API endpoint (/gp/product/ajax/get-price/) needs session
+        # cookies, so it is not attempted.
+        outcome = await _first_successful({
+            "Mobile URL": from_mobile_url(),
+            "Search": from_search(),
+        }, "Amazon")
+        if outcome:
+            result.update(outcome)
         
         return result
     
@@ -236,14 +337,26 @@ class AmazonScraper:
         
         return data
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _asin_block_re(asin: str) -> "re.Pattern":
+        """
+        Compiled pattern for the block following data-asin="<asin>".
+        
+        The body is an unrolled "anything up to the first </div>" loop, so it
+        cannot backtrack across nested tags the way (.*?) with DOTALL does.
+        """
+        return re.compile(
+            rf'data-asin="{re.escape(asin)}"[^>]*>([^<]*(?:<(?!/div>)[^<]*)*)</div>'
+        )
+    
     @classmethod
     def _parse_from_search(cls, content: str, asin: str) -> Dict:
         """Parse product from search results."""
         data = {"asin": asin}
         
         # Find the specific ASIN in search results
-        asin_pattern = rf'data-asin="{asin}"[^>]*>(.*?)</div>'
-        match = re.search(asin_pattern, content, re.DOTALL)
+        match = cls._asin_block_re(asin).search(content)
         
         if match:
             block = match.group(1)
@@ -277,6 +390,7 @@ class IndeedScraper:
     """
     
     @classmethod
+    @_cache_successful()
     async def scrape_jobs(cls, query: str, location: str, scraper) -> Dict:
         """
         Scrape Indeed job listings.
@@ -289,41 +403,36 @@ class IndeedScraper:
             "success": False
         }
         
-        # Strategy 1: RSS feed (often less protected)
-        try:
+        async def from_rss():
             rss_url = f"https://www.indeed.com/rss?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}"
             content = await scraper.scrape(rss_url)
             if content and "<item>" in content:
-                result["jobs"] = cls._parse_rss(content)
-                result["source"] = "rss"
-                result["success"] = len(result["jobs"]) > 0
-                return result
-        except Exception as e:
-            logger.debug(f"[Indeed] RSS failed: {e}")
+                jobs = cls._parse_rss(content)
+                return {"jobs": jobs, "source": "rss", "success": len(jobs) > 0}
         
-        # Strategy 2: Google Jobs API endpoint
-        try:
+        async def from_google():
             google_url = f"https://www.google.com/search?q={query}+jobs+{location}+site:indeed.com"
             content = await scraper.scrape(google_url)
             if content:
-                result["jobs"] = cls._parse_google_jobs(content)
-                result["source"] = "google"
-                result["success"] = len(result["jobs"]) > 0
-                return result
-        except Exception as e:
-            logger.debug(f"[Indeed] Google jobs failed: {e}")
+                jobs = cls._parse_google_jobs(content)
+                return {"jobs": jobs, "source": "google", "success": len(jobs) > 0}
         
-        # Strategy 3: Direct with ultra stealth
-        try:
+        async def from_direct():
             indeed_url = f"https://www.indeed.com/jobs?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}"
             content = await scraper.scrape(indeed_url, force_ultra_stealth=True)
             if content and len(content) > 2000:
-                result["jobs"] = cls._parse_indeed_page(content)
-                result["source"] = "direct"
-                result["success"] = len(result["jobs"]) > 0
-                return result
-        except Exception as e:
-            logger.debug(f"[Indeed] Direct failed: {e}")
+                jobs = cls._parse_indeed_page(content)
+                return {"jobs": jobs, "source": "direct", "success": len(jobs) > 0}
+        
+        # RSS feed (often less protected), Google Jobs results and direct
+        # ultra-stealth page run concurrently
+        outcome = await _first_successful({
+            "RSS": from_rss(),
+            "Google jobs": from_google(),
+            "Direct": from_direct(),
+        }, "Indeed")
+        if outcome:
+            result.update(outcome)
         
         return result
     
@@ -332,6 +441,51 @@ class IndeedScraper:
         """Parse jobs from RSS feed."""
         jobs = []
         
+        # Pull-parse the feed so items are handled as they are read, without
+        # regex backtracking over the whole body
+        parser = ET.XMLPullParser(events=("end",))
+        parser.feed(content)
+        
+        items_seen = 0
+        try:
+            for _, elem in parser.read_events():
+                if elem.tag != "item":
+                    continue
+                items_seen += 1
+                
+                job = {}
+                
+                title = elem.findtext("title")
+                if title:
+                    job["title"] = title
+                
+                link = elem.findtext("link")
+                if link:
+                    job["url"] = link
+                
+                company = elem.findtext("source")
+                if company:
+                    job["company"] = company
+                
+                if job.get("title"):
+                    jobs.append(job)
+                
+                elem.clear()
+                if items_seen >= 20:
+                    break
+        except ET.ParseError as e:
+            # Feeds often carry HTML entities (&nbsp;), bare '&' or junk before
+            # the prolog, which strict XML rejects; the regex scan copes with them
+            logger.debug(f"[Indeed] RSS is not well-formed XML, using regex scan: {e}")
+            return cls._parse_rss_regex(content)
+        
+        return jobs
+    
+    @classmethod
+    def _parse_rss_regex(cls, content: str) -> List[Dict]:
+        """Parse jobs from an RSS feed that is not well-formed XML."""
+        jobs = []
+        
         items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
         for item in items[:20]:
             job = {}
@@ -375,10 +529,18 @@ class IndeedScraper:
         """Parse Indeed job listings from direct page."""
         jobs = []
         
-        # Find job cards
-        job_blocks = re.findall(r'data-jk="([^"]+)"(.*?)</td>', content, re.DOTALL)
-        
-        for job_id, block in job_blocks[:20]:
+        # Find job cards: each block runs from its data-jk attribute to the
+        # first </td> before the next card, found with plain str.find instead
+        # of a DOTALL lazy match that rescans the page for every card
+        cards = [(m.group(1), m.start(), m.end()) for m in re.finditer(r'data-jk="([^"]+)"', content)]
+        
+        for i, (job_id, _, start) in enumerate(cards[:20]):
+            # Stop where the next card's attribute begins, not where it ends
+            limit = cards[i + 1][1] if i + 1 < len(cards) else len(content)
+            end = content.find("</td>", start, limit)
+            if end == -1:
+                continue
+            block = content[start:end]
             job = {"id": job_id}
             
             title_match = re.search(r'jobTitle[^>]*>([^<]+)', block)
@@ -411,6 +573,7 @@ class SocialMediaScraper:
     """
     
     @classmethod
+    @_cache_successful()
     async def get_twitter_post(cls, tweet_url: str, scraper) -> Dict:
         """Get Twitter/X post content via oEmbed."""
         result = {"url": tweet_url, "data": {}, "success": False}
@@ -419,8 +582,9 @@ class SocialMediaScraper:
         try:
             oembed_url = f"https://publish.twitter.com/oembed?url={tweet_url}"
             content = await scraper.scrape(oembed_url)
-            if content and "{" in content:
-                data = json.loads(content)
+            if content:
+                # Non-JSON bodies (HTML error pages) raise straight away
+                data = _loads(content)
                 result["data"] = {
                     "html": data.get("html"),
                     "author": data.get("author_name"),
@@ -434,7 +598,7 @@ class SocialMediaScraper:
         # Strategy 2: Nitter instance (Twitter mirror)
         try:
             # Extract tweet ID
-            tweet_id = re.search(r'/status/(\d+)', tweet_url)
+            tweet_id = _TWEET_ID_RE.search(tweet_url)
             if tweet_id:
                 nitter_url = f"https://nitter.net/i/status/{tweet_id.group(1)}"
                 content = await scraper.scrape(nitter_url)
@@ -449,6 +613,7 @@ class SocialMediaScraper:
         return result
     
     @classmethod
+    @_cache_successful()
     async def get_instagram_post(cls, post_url: str, scraper) -> Dict:
         """Get Instagram post via embed endpoint."""
         result = {"url": post_url, "data": {}, "success": False}
@@ -457,8 +622,9 @@ class SocialMediaScraper:
         try:
             oembed_url = f"https://api.instagram.com/oembed?url={post_url}"
             content = await scraper.scrape(oembed_url)
-            if content and "{" in content:
-                data = json.loads(content)
+            if content:
+                # Non-JSON bodies (HTML error pages) raise straight away
+                data = _loads(content)
                 result["data"] = {
                     "html": data.get("html"),
                     "title": data.get("title"),
@@ -472,6 +638,7 @@ class SocialMediaScraper:
         return result
     
     @classmethod
+    @_cache_successful()
     async def get_facebook_post(cls, post_url: str, scraper) -> Dict:
         """Get Facebook post via embed."""
         result = {"url": post_url, "data": {}, "success": False}
@@ -480,8 +647,9 @@ class SocialMediaScraper:
         try:
             oembed_url = f"https://www.facebook.com/plugins/post/oembed.json/?url={post_url}"
             content = await scraper.scrape(oembed_url)
-            if content and "{" in content:
-                data = json.loads(content)
+            if content:
+                # Non-JSON bodies (HTML error pages) raise straight away
+                data = _loads(content)
                 result["data"] = {"html": data.get("html")}
                 result["success"] = True
         except Exception as e:
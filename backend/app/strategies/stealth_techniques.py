@@ -11,14 +11,166 @@ Strategies:
 """
 
 import asyncio
+import functools
 import random
 import json
+import mmap
 import os
-import hashlib
+import time
+from collections import deque
 from typing import Dict, Optional, List, Tuple
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data) -> bytes:
+    """Compact JSON bytes (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=str)
+    return json.dumps(data, default=str).encode()
+
+
+def _loads(data):
+    """Parse JSON bytes (orjson when installed)."""
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _write_session(path: str, session_data: Dict):
+    """
+    Write a session as JSONL: one header line (everything but the cookies)
+    followed by one line per cookie, so the jar is never serialized as a
+    single document.
+    """
+    header = {k: v for k, v in session_data.items() if k != "cookies"}
+    header["format"] = "jsonl"
+    with open(path, 'wb') as f:
+        f.write(_dumps(header) + b"\n")
+        for cookie in session_data.get("cookies", []):
+            f.write(_dumps(cookie) + b"\n")
+
+
+def _read_session(path: str, with_cookies: bool = True) -> Dict:
+    """
+    Read a session file written by _write_session (or a legacy single-document
+    JSON file). Lines are parsed straight from an mmap of the file. With
+    with_cookies=False only the cookie count is returned, as "cookie_count".
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Empty session file: {path}")
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = mm.find(b"\n")
+            if end == -1:
+                end = len(mm)
+            try:
+                header = _loads(mm[:end])
+            except ValueError:
+                header = None
+            
+            if not isinstance(header, dict) or header.get("format") != "jsonl":
+                # Legacy pretty-printed JSON document
+                data = _loads(mm[:])
+                data["cookie_count"] = len(data.get("cookies", []))
+                return data
+            
+            cookies = []
+            count = 0
+            pos = end + 1
+            while pos < len(mm):
+                end = mm.find(b"\n", pos)
+                if end == -1:
+                    end = len(mm)
+                if end > pos:
+                    count += 1
+                    if with_cookies:
+                        cookies.append(_loads(mm[pos:end]))
+                pos = end + 1
+    
+    header["cookie_count"] = count
+    if with_cookies:
+        header["cookies"] = cookies
+    return header
+
+
+def _saved_at_epoch(session_data: Dict) -> float:
+    """Save time of a session as epoch seconds (ISO parse only for legacy files)."""
+    epoch = session_data.get("saved_at_epoch")
+    if epoch is not None:
+        return epoch
+    return datetime.fromisoformat(session_data["saved_at"]).timestamp()
+
+
+@functools.lru_cache(maxsize=1024)
+def _session_path(storage_dir: str, domain: str) -> str:
+    """Storage path for a domain's session file."""
+    safe_domain = domain.replace(".", "_").replace(":", "_")
+    return os.path.join(storage_dir, f"{safe_domain}_session.json")
+
+
+# Realistic browser plugins; read-only here, copied into each fingerprint
+_PLUGINS = tuple(MappingProxyType(plugin) for plugin in [
+    {"name": "Chrome PDF Plugin", "filename": "internal-pdf-viewer"},
+    {"name": "Chrome PDF Viewer", "filename": "mhjfbmdgcfjbbpaeojofohoefgiehjai"},
+    {"name": "Native Client", "filename": "internal-nacl-plugin"}
+])
+
+
+# Fingerprint masking script, parsed once; filled per fingerprint with format_map
+_STEALTH_SCRIPT_TEMPLATE = """
+        // Override navigator properties
+        Object.defineProperty(navigator, 'webdriver', {{
+            get: () => undefined
+        }});
+        
+        Object.defineProperty(navigator, 'languages', {{
+            get: () => {languages}
+        }});
+        
+        Object.defineProperty(navigator, 'platform', {{
+            get: () => '{platform}'
+        }});
+        
+        Object.defineProperty(navigator, 'hardwareConcurrency', {{
+            get: () => {hardware_concurrency}
+        }});
+        
+        Object.defineProperty(navigator, 'deviceMemory', {{
+            get: () => {device_memory}
+        }});
+        
+        // Override screen properties
+        Object.defineProperty(screen, 'width', {{
+            get: () => {width}
+        }});
+        
+        Object.defineProperty(screen, 'height', {{
+            get: () => {height}
+        }});
+        
+        // WebGL fingerprint masking
+        const getParameterProxy = WebGLRenderingContext.prototype.getParameter;
+        WebGLRenderingContext.prototype.getParameter = function(parameter) {{
+            if (parameter === 37445) return '{webgl_vendor}';
+            if (parameter === 37446) return '{webgl_renderer}';
+            return getParameterProxy.call(this, parameter);
+        }};
+        
+        // Mask automation detection
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
+        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
+        
+        console.log('[Stealth] Fingerprint masking applied');
+        """
+
 
 class FingerprintMasker:
     """
@@ -60,11 +212,13 @@ class FingerprintMasker:
         Args:
             seed: Optional seed for reproducible fingerprints
         """
-        if seed:
-            random.seed(hashlib.md5(seed.encode()).hexdigest())
+        # Local generator: seeding never touches the global random state.
+        # Random(seed) is the only derivation, so a seed maps to the same
+        # fingerprint on every deployment whatever optional packages exist.
+        rng = random.Random(seed) if seed else random
         
-        resolution = random.choice(cls.SCREEN_RESOLUTIONS)
-        webgl = random.choice(cls.WEBGL_VENDORS)
+        resolution = rng.choice(cls.SCREEN_RESOLUTIONS)
+        webgl = rng.choice(cls.WEBGL_VENDORS)
         
         fingerprint = {
             "screen": {
@@ -75,32 +229,25 @@ class FingerprintMasker:
                 "colorDepth": 24,
                 "pixelDepth": 24
             },
-            "timezone": random.choice(cls.TIMEZONES),
-            "languages": random.choice(cls.LANGUAGES),
+            "timezone": rng.choice(cls.TIMEZONES),
+            "languages": rng.choice(cls.LANGUAGES),
             "webgl": {
                 "vendor": webgl[0],
                 "renderer": webgl[1]
             },
-            "platform": random.choice(["Win32", "MacIntel", "Linux x86_64"]),
-            "hardwareConcurrency": random.choice([4, 8, 12, 16]),
-            "deviceMemory": random.choice([4, 8, 16, 32]),
+            "platform": rng.choice(["Win32", "MacIntel", "Linux x86_64"]),
+            "hardwareConcurrency": rng.choice([4, 8, 12, 16]),
+            "deviceMemory": rng.choice([4, 8, 16, 32]),
             "maxTouchPoints": 0,  # Desktop
             "plugins": cls._generate_plugins()
         }
         
-        # Reset random seed
-        random.seed()
-        
         return fingerprint
     
     @classmethod
     def _generate_plugins(cls) -> List[Dict]:
-        """Generate realistic browser plugins."""
-        return [
-            {"name": "Chrome PDF Plugin", "filename": "internal-pdf-viewer"},
-            {"name": "Chrome PDF Viewer", "filename": "mhjfbmdgcfjbbpaeojofohoefgiehjai"},
-            {"name": "Native Client", "filename": "internal-nacl-plugin"}
-        ]
+        """Realistic browser plugins, as plain JSON-serializable dicts."""
+        return [dict(plugin) for plugin in _PLUGINS]
     
     @classmethod
     def get_stealth_scripts(cls, fingerprint: Dict) -> str:
@@ -108,52 +255,16 @@ class FingerprintMasker:
         Generate JavaScript to mask fingerprints.
         Inject this before page load.
         """
-        return f"""
-        // Override navigator properties
-        Object.defineProperty(navigator, 'webdriver', {{
-            get: () => undefined
-        }});
-        
-        Object.defineProperty(navigator, 'languages', {{
-            get: () => {json.dumps(fingerprint['languages'])}
-        }});
-        
-        Object.defineProperty(navigator, 'platform', {{
-            get: () => '{fingerprint["platform"]}'
-        }});
-        
-        Object.defineProperty(navigator, 'hardwareConcurrency', {{
-            get: () => {fingerprint['hardwareConcurrency']}
-        }});
-        
-        Object.defineProperty(navigator, 'deviceMemory', {{
-            get: () => {fingerprint['deviceMemory']}
-        }});
-        
-        // Override screen properties
-        Object.defineProperty(screen, 'width', {{
-            get: () => {fingerprint['screen']['width']}
-        }});
-        
-        Object.defineProperty(screen, 'height', {{
-            get: () => {fingerprint['screen']['height']}
-        }});
-        
-        // WebGL fingerprint masking
-        const getParameterProxy = WebGLRenderingContext.prototype.getParameter;
-        WebGLRenderingContext.prototype.getParameter = function(parameter) {{
-            if (parameter === 37445) return '{fingerprint["webgl"]["vendor"]}';
-            if (parameter === 37446) return '{fingerprint["webgl"]["renderer"]}';
-            return getParameterProxy.call(this, parameter);
-        }};
-        
-        // Mask automation detection
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Array;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Promise;
-        delete window.cdc_adoQpoasnfa76pfcZLmcfl_Symbol;
-        
-        console.log('[Stealth] Fingerprint masking applied');
-        """
+        return _STEALTH_SCRIPT_TEMPLATE.format_map({
+            "languages": json.dumps(fingerprint['languages']),
+            "platform": fingerprint["platform"],
+            "hardware_concurrency": fingerprint['hardwareConcurrency'],
+            "device_memory": fingerprint['deviceMemory'],
+            "width": fingerprint['screen']['width'],
+            "height": fingerprint['screen']['height'],
+            "webgl_vendor": fingerprint["webgl"]["vendor"],
+            "webgl_renderer": fingerprint["webgl"]["renderer"],
+        })
 
 
 class SessionTrustBuilder:
@@ -171,6 +282,21 @@ class SessionTrustBuilder:
         "glassdoor.com": ["/", "/about-us.htm"],
     }
     
+    # Shuffled warmup paths per domain, rotated on every warmup
+    _warmup_queues: Dict[str, deque] = {}
+    
+    @classmethod
+    def _next_warmup_paths(cls, domain: str) -> List[str]:
+        """Take the next 1-2 warmup paths for a domain, rotating its queue."""
+        queue = cls._warmup_queues.get(domain)
+        if queue is None:
+            paths = cls.WARMUP_PATHS.get(domain, cls.WARMUP_PATHS["default"])
+            queue = cls._warmup_queues[domain] = deque(random.sample(paths, len(paths)))
+        
+        picked = [queue.popleft() for _ in range(min(2, len(queue)))]
+        queue.extend(picked)
+        return picked
+    
     @classmethod
     async def warmup_session(cls, page, base_url: str, duration: float = 5.0) -> bool:
         """
@@ -186,16 +312,14 @@ class SessionTrustBuilder:
         """
         from urllib.parse import urlparse
         
-        domain = urlparse(base_url).netloc.lower()
-        
-        # Get warmup paths for this domain
-        paths = cls.WARMUP_PATHS.get(domain, cls.WARMUP_PATHS["default"])
+        parsed = urlparse(base_url)
+        domain = parsed.netloc.lower()
         
         logger.info(f"[TrustBuild] Warming up session for {domain}...")
         
         try:
             # Visit homepage first
-            homepage = f"{urlparse(base_url).scheme}://{domain}"
+            homepage = f"{parsed.scheme}://{domain}"
             await page.goto(homepage, wait_until="domcontentloaded", timeout=15000)
             
             # Wait and scroll
@@ -203,7 +327,7 @@ class SessionTrustBuilder:
             await cls._human_scroll(page)
             
             # Visit 1-2 warmup pages
-            for path in random.sample(paths, min(2, len(paths))):
+            for path in cls._next_warmup_paths(domain):
                 if path == "/":
                     continue
                     
@@ -240,6 +364,58 @@ class BehaviorSimulator:
     Mimics human behavior patterns.
     """
     
+    # Runs a pre-planned scroll/pause/focus timeline inside the page, so the
+    # whole sequence costs one evaluate round-trip
+    TIMELINE_SCRIPT = """
+    async (actions) => {
+        for (const a of actions) {
+            if (a.type === 'scroll') window.scrollBy(0, a.amount);
+            else if (a.type === 'focus') document.body.click();
+            await new Promise(r => setTimeout(r, a.delay));
+        }
+    }
+    """
+    
+    @classmethod
+    def _plan_behavior(cls, duration: float) -> Tuple[List[Dict], List[Tuple[int, int, float]]]:
+        """
+        Plan random actions until they fill the duration.
+        
+        Returns (page actions with delays in ms, mouse moves as (x, y, start offset in s)).
+        """
+        actions = []
+        moves = []
+        elapsed = 0.0
+        
+        while elapsed < duration:
+            action = random.choice(["scroll", "pause", "mouse", "focus"])
+            
+            if action == "scroll":
+                direction = random.choice([1, 1, 1, -1])  # Mostly down
+                amount = random.randint(100, 400) * direction
+                delay = random.uniform(0.2, 0.5)
+                actions.append({"type": "scroll", "amount": amount, "delay": int(delay * 1000)})
+                
+            elif action == "pause":
+                # Reading pause
+                delay = random.uniform(0.5, 1.5)
+                actions.append({"type": "pause", "delay": int(delay * 1000)})
+                
+            elif action == "mouse":
+                # Random mouse movement; the page timeline idles meanwhile
+                delay = random.uniform(0.1, 0.3)
+                moves.append((random.randint(100, 800), random.randint(100, 600), elapsed))
+                actions.append({"type": "pause", "delay": int(delay * 1000)})
+                
+            else:
+                # Simulate focus/blur
+                delay = random.uniform(0.1, 0.2)
+                actions.append({"type": "focus", "delay": int(delay * 1000)})
+            
+            elapsed += delay
+        
+        return actions, moves
+    
     @classmethod
     async def simulate_human_behavior(cls, page, duration: float = 3.0):
         """
@@ -251,36 +427,24 @@ class BehaviorSimulator:
         - Reading pauses
         - Focus/blur events
         """
-        start = asyncio.get_event_loop().time()
+        actions, moves = cls._plan_behavior(duration)
         
-        while asyncio.get_event_loop().time() - start < duration:
-            action = random.choice(["scroll", "pause", "mouse", "focus"])
-            
-            try:
-                if action == "scroll":
-                    direction = random.choice([1, 1, 1, -1])  # Mostly down
-                    amount = random.randint(100, 400) * direction
-                    await page.evaluate(f"window.scrollBy(0, {amount})")
-                    await asyncio.sleep(random.uniform(0.2, 0.5))
-                    
-                elif action == "pause":
-                    # Reading pause
-                    await asyncio.sleep(random.uniform(0.5, 1.5))
-                    
-                elif action == "mouse":
-                    # Random mouse movement
-                    x = random.randint(100, 800)
-                    y = random.randint(100, 600)
-                    await page.mouse.move(x, y)
-                    await asyncio.sleep(random.uniform(0.1, 0.3))
-                    
-                elif action == "focus":
-                    # Simulate focus/blur
-                    await page.evaluate("document.body.click()")
-                    await asyncio.sleep(random.uniform(0.1, 0.2))
-                    
-            except:
-                pass  # Behavior simulation failures are OK
+        async def run_mouse():
+            # Mouse input has to come from Playwright, so moves are replayed
+            # alongside the in-page timeline at their planned offsets
+            start = asyncio.get_running_loop().time()
+            for x, y, offset in moves:
+                delay = offset - (asyncio.get_running_loop().time() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await page.mouse.move(x, y)
+        
+        # Behavior simulation failures are OK
+        await asyncio.gather(
+            page.evaluate(cls.TIMELINE_SCRIPT, actions),
+            run_mouse(),
+            return_exceptions=True
+        )
     
     @classmethod
     async def human_type(cls, page, selector: str, text: str):
@@ -289,9 +453,15 @@ class BehaviorSimulator:
         if not element:
             return
             
-        for char in text:
-            await element.type(char, delay=random.randint(50, 150))
-            if random.random() < 0.1:  # Occasional pause
+        # Playwright applies the per-key delay itself, so each segment is one
+        # call; the text is cut at 2-3 random points for occasional pauses
+        pauses = min(random.randint(2, 3), max(len(text) - 1, 0))
+        splits = sorted(random.sample(range(1, len(text)), pauses))
+        bounds = [0, *splits, len(text)]
+        
+        for start, end in zip(bounds, bounds[1:]):
+            await element.type(text[start:end], delay=random.randint(50, 150))
+            if end < len(text):  # Occasional pause
                 await asyncio.sleep(random.uniform(0.1, 0.3))
     
     @classmethod
@@ -316,11 +486,12 @@ class CookiePersistence:
     
     def __init__(self):
         os.makedirs(self.STORAGE_DIR, exist_ok=True)
+        # (directory mtime, session summaries) from the last list_sessions scan
+        self._sessions_cache: Optional[Tuple[Tuple[int, int], List[Dict]]] = None
     
     def get_session_path(self, domain: str) -> str:
         """Get storage path for a domain's session."""
-        safe_domain = domain.replace(".", "_").replace(":", "_")
-        return os.path.join(self.STORAGE_DIR, f"{safe_domain}_session.json")
+        return _session_path(self.STORAGE_DIR, domain)
     
     async def save_session(self, context, domain: str):
         """
@@ -342,12 +513,14 @@ class CookiePersistence:
             session_data = {
                 "domain": domain,
                 "saved_at": datetime.now().isoformat(),
+                "saved_at_epoch": time.time(),
                 "cookies": cookies,
                 "storage": storage
             }
             
-            with open(path, 'w') as f:
-                json.dump(session_data, f, indent=2, default=str)
+            # Serialize and write off the event loop
+            await asyncio.to_thread(_write_session, path, session_data)
+            self._sessions_cache = None
             
             logger.info(f"[Session] Saved {len(cookies)} cookies for {domain}")
             
@@ -367,16 +540,15 @@ class CookiePersistence:
             if not os.path.exists(path):
                 return False
             
-            with open(path, 'r') as f:
-                session_data = json.load(f)
+            session_data = await asyncio.to_thread(_read_session, path)
             
             # Check age
-            saved_at = datetime.fromisoformat(session_data["saved_at"])
-            age = (datetime.now() - saved_at).total_seconds()
+            age = time.time() - _saved_at_epoch(session_data)
             
             if age > self.SESSION_MAX_AGE:
                 logger.info(f"[Session] Session for {domain} expired")
                 os.remove(path)
+                self._sessions_cache = None
                 return False
             
             # Load cookies
@@ -396,32 +568,75 @@ class CookiePersistence:
         path = self.get_session_path(domain)
         if os.path.exists(path):
             os.remove(path)
+            self._sessions_cache = None
             logger.info(f"[Session] Cleared session for {domain}")
     
-    def list_sessions(self) -> List[Dict]:
+    async def list_sessions(self) -> List[Dict]:
         """List all saved sessions."""
-        sessions = []
+        # Rescan only when the directory changed or this instance wrote to it;
+        # nanosecond mtime plus size catches changes within one timestamp tick
+        stat = os.stat(self.STORAGE_DIR)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if self._sessions_cache is None or self._sessions_cache[0] != version:
+            self._sessions_cache = (version, await self._scan_sessions())
         
-        for filename in os.listdir(self.STORAGE_DIR):
-            if filename.endswith("_session.json"):
-                path = os.path.join(self.STORAGE_DIR, filename)
-                try:
-                    with open(path, 'r') as f:
-                        data = json.load(f)
-                    
-                    saved_at = datetime.fromisoformat(data["saved_at"])
-                    age = (datetime.now() - saved_at).total_seconds()
-                    
-                    sessions.append({
-                        "domain": data["domain"],
-                        "cookies": len(data.get("cookies", [])),
-                        "age_hours": round(age / 3600, 1),
-                        "expired": age > self.SESSION_MAX_AGE
-                    })
-                except:
-                    pass
+        sessions = []
+        now = time.time()
+        for entry in self._sessions_cache[1]:
+            age = now - entry["saved_at_epoch"]
+            sessions.append({
+                "domain": entry["domain"],
+                "cookies": entry["cookies"],
+                "age_hours": round(age / 3600, 1),
+                "expired": age > self.SESSION_MAX_AGE
+            })
         
         return sessions
+    
+    async def _scan_sessions(self) -> List[Dict]:
+        """Read the domain, cookie count and save time of every session file."""
+        paths = [
+            os.path.join(self.STORAGE_DIR, filename)
+            for filename in os.listdir(self.STORAGE_DIR)
+            if filename.endswith("_session.json")
+        ]
+        
+        # Files are read concurrently off the event loop; unreadable ones are skipped
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._read_entry, path) for path in paths),
+            return_exceptions=True
+        )
+        return [entry for entry in results if isinstance(entry, dict)]
+    
+    @staticmethod
+    def _read_entry(path: str) -> Dict:
+        """Summary of one session file for list_sessions."""
+        data = _read_session(path, with_cookies=False)
+        return {
+            "domain": data["domain"],
+            "cookies": data["cookie_count"],
+            "saved_at_epoch": _saved_at_epoch(data)
+        }
+
+
+class _DomainBucket:
+    """
+    Shared pacing slots for one domain.
+    Each reservation ends a full jittered gap after the later of now and
+    the previous reservation, so every request waits at least one gap and
+    concurrent workers queue up behind each other.
+    """
+    
+    def __init__(self):
+        self.next_slot = 0.0
+    
+    def reserve(self, min_gap: float, max_gap: float) -> float:
+        """Reserve the next slot and return how long to wait for it."""
+        # No await between reading and moving next_slot, so this is atomic
+        # on the event loop
+        now = time.monotonic()
+        self.next_slot = max(now, self.next_slot) + random.uniform(min_gap, max_gap)
+        return self.next_slot - now
 
 
 class LowAndSlow:
@@ -438,10 +653,20 @@ class LowAndSlow:
         "reading_time": (3, 8)
     }
     
+    # Pacing buckets shared by every caller, keyed by domain
+    _buckets: Dict[str, _DomainBucket] = {}
+    
+    @classmethod
+    def _bucket(cls, domain: str) -> _DomainBucket:
+        bucket = cls._buckets.get(domain)
+        if bucket is None:
+            bucket = cls._buckets[domain] = _DomainBucket()
+        return bucket
+    
     @classmethod
-    async def wait_between_requests(cls):
-        """Wait a random time between requests."""
-        wait = random.uniform(*cls.TIMING["between_requests"])
+    async def wait_between_requests(cls, domain: str):
+        """Wait for this domain's next request slot."""
+        wait = cls._bucket(domain).reserve(*cls.TIMING["between_requests"])
         logger.debug(f"[LowSlow] Waiting {wait:.1f}s between requests")
         await asyncio.sleep(wait)
     
@@ -452,9 +677,12 @@ class LowAndSlow:
         await asyncio.sleep(wait)
     
     @classmethod
-    async def wait_after_error(cls):
-        """Extended wait after an error."""
-        wait = random.uniform(*cls.TIMING["after_error"])
+    async def wait_after_error(cls, domain: str):
+        """Extended wait after an error; also delays other workers on the domain."""
+        bucket = cls._bucket(domain)
+        now = time.monotonic()
+        bucket.next_slot = max(bucket.next_slot, now) + random.uniform(*cls.TIMING["after_error"])
+        wait = bucket.next_slot - now
         logger.info(f"[LowSlow] Cooling down for {wait:.1f}s after error")
         await asyncio.sleep(wait)
     
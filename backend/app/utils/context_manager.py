@@ -2,10 +2,64 @@
 ADVANCED LLM Context Management
 Handles large content with intelligent chunking and summarization
 """
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from loguru import logger
+import hashlib
+import numpy as np
 import re
 
+from app.utils.matching import count_terms
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+# Tokenizer patterns shared by the split/score/compress paths
+_SENT_RE = re.compile(r'([.!?]+\s+)')
+_WORD_RE = re.compile(r'\w+')
+
+# Per-chunk scores, indexed by chunk id
+_SCORE_DTYPE = np.dtype([
+    ('relevance', np.float64),
+    ('overlap', np.int32),
+    ('term_freq', np.int32),
+])
+
+# Recent prepare_content_for_llm results, keyed by
+# (content digest, query, char_limit, max_chunks)
+_PREPARE_CACHE: "OrderedDict[Tuple, List[Dict[str, Any]]]" = OrderedDict()
+_PREPARE_CACHE_SIZE = 256
+
+
+def _content_digest(content: str):
+    """Fast fingerprint of content for cache keys."""
+    data = content.encode('utf-8', 'surrogatepass')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh64(data).intdigest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _iter_paragraphs(content: str):
+    """Yield (start, end) offsets of the paragraphs separated by double newlines."""
+    pos = 0
+    while True:
+        end = content.find('\n\n', pos)
+        if end == -1:
+            yield pos, len(content)
+            return
+        yield pos, end
+        pos = end + 2
+
 
 class AdvancedContextManager:
     """
@@ -62,24 +116,56 @@ class AdvancedContextManager:
                 'is_complete': True
             }]
         
+        # Retries and multi-model runs often repeat the same (content, query)
+        cache_key = (_content_digest(content), query, char_limit, max_chunks)
+        cached = _PREPARE_CACHE.get(cache_key)
+        if cached is not None:
+            _PREPARE_CACHE.move_to_end(cache_key)
+            logger.info(f"Reusing {len(cached)} chunks for {len(content)} chars (limit: {char_limit})")
+            return [dict(chunk) for chunk in cached]
+        
         # ALGORITHM 1: Split at semantic boundaries
-        chunks = AdvancedContextManager._semantic_split(content, char_limit)
+        spans = AdvancedContextManager._semantic_spans(content, char_limit)
+        chunks = [content[start:end] for start, end in spans]
+        
+        # Lowercase once and slice; only when no character changes length
+        # under lower(), otherwise the spans would not line up
+        content_lower = content.lower()
+        if len(content_lower) == len(content):
+            chunks_lower = [content_lower[start:end] for start, end in spans]
+        else:
+            chunks_lower = [chunk.lower() for chunk in chunks]
         
         # ALGORITHM 2: Score chunks by relevance to query
-        scored_chunks = AdvancedContextManager._score_by_relevance(chunks, query)
+        scored = AdvancedContextManager._score_by_relevance(chunks, query, chunks_lower)
         
         # ALGORITHM 3: Select top chunks + add context
         selected = AdvancedContextManager._select_with_context(
-            scored_chunks, 
+            chunks,
+            scored,
             max_chunks,
             char_limit
         )
         
         logger.info(f"Split {len(content)} chars into {len(selected)} chunks (limit: {char_limit})")
+        
+        # Cache private copies so callers can mutate what they get back
+        _PREPARE_CACHE[cache_key] = [dict(chunk) for chunk in selected]
+        if len(_PREPARE_CACHE) > _PREPARE_CACHE_SIZE:
+            _PREPARE_CACHE.popitem(last=False)
+        
         return selected
     
     @staticmethod
     def _semantic_split(content: str, chunk_size: int) -> List[str]:
+        """Split text at semantic boundaries (see _semantic_spans)"""
+        return [
+            content[start:end]
+            for start, end in AdvancedContextManager._semantic_spans(content, chunk_size)
+        ]
+    
+    @staticmethod
+    def _semantic_spans(content: str, chunk_size: int) -> List[Tuple[int, int]]:
         """
         ADVANCED: Split text at semantic boundaries
         
@@ -89,55 +175,59 @@ class AdvancedContextManager:
         3. Sentence endings (. ! ?)
         4. Word boundaries
         """
-        chunks = []
-        
-        # STEP 1: Try splitting by paragraphs
-        paragraphs = content.split('\n\n')
+        spans = []
         
-        current_chunk = []
+        # Chunks are contiguous spans of content, returned as offsets so the
+        # caller can slice the raw and lowercased text alike
+        chunk_start = None
+        chunk_end = 0
         current_size = 0
         
-        for para in paragraphs:
-            para_size = len(para)
+        # STEP 1: Walk paragraphs (double newlines) without materializing them
+        for start, end in _iter_paragraphs(content):
+            para_size = end - start
             
-            if current_size + para_size > chunk_size and current_chunk:
+            if current_size + para_size > chunk_size and chunk_start is not None:
                 # Save current chunk
-                chunks.append('\n\n'.join(current_chunk))
-                current_chunk = []
+                spans.append((chunk_start, chunk_end))
+                chunk_start = None
                 current_size = 0
             
             if para_size > chunk_size:
-                # Para too large, split by sentences
-                sentences = re.split(r'([.!?]+\s+)', para)
+                # Para too large, split by sentences (only this paragraph)
+                sentence_start = pos = start
+                boundaries = [m.end() for m in _SENT_RE.finditer(content, start, end)]
+                boundaries.append(end)
                 
-                sentence_chunk = ""
-                for i in range(0, len(sentences), 2):
-                    sent = sentences[i]
-                    punct = sentences[i+1] if i+1 < len(sentences) else ""
-                    full_sent = sent + punct
-                    
-                    if len(sentence_chunk) + len(full_sent) > chunk_size:
-                        if sentence_chunk:
-                            chunks.append(sentence_chunk)
-                        sentence_chunk = full_sent
-                    else:
-                        sentence_chunk += full_sent
+                for boundary in boundaries:
+                    if (pos - sentence_start) + (boundary - pos) > chunk_size:
+                        if pos > sentence_start:
+                            spans.append((sentence_start, pos))
+                        sentence_start = pos
+                    pos = boundary
                 
-                if sentence_chunk:
-                    current_chunk.append(sentence_chunk)
-                    current_size += len(sentence_chunk)
+                if end > sentence_start:
+                    chunk_start = sentence_start
+                    chunk_end = end
+                    current_size += end - sentence_start
             else:
-                current_chunk.append(para)
+                if chunk_start is None:
+                    chunk_start = start
+                chunk_end = end
                 current_size += para_size
         
         # Add remaining
-        if current_chunk:
-            chunks.append('\n\n'.join(current_chunk))
+        if chunk_start is not None:
+            spans.append((chunk_start, chunk_end))
         
-        return chunks
+        return spans
     
     @staticmethod
-    def _score_by_relevance(chunks: List[str], query: str) -> List[Dict]:
+    def _score_by_relevance(
+        chunks: List[str],
+        query: str,
+        chunks_lower: Optional[List[str]] = None
+    ) -> np.ndarray:
         """
         ADVANCED: Score chunks by relevance to query
         
@@ -145,19 +235,43 @@ class AdvancedContextManager:
         - Keyword overlap
         - Query term frequency
         - Position in document (earlier = more relevant)
+        
+        Returns a structured array indexed by chunk id (fields: relevance,
+        overlap, term_freq); chunk text stays in the chunks list.
+        chunks_lower may carry the already-lowercased chunks.
         """
-        query_terms = set(re.findall(r'\w+', query.lower()))
+        if chunks_lower is None:
+            chunks_lower = [chunk.lower() for chunk in chunks]
         
-        scored = []
+        query_terms = set(_WORD_RE.findall(query.lower()))
+        
+        # One automaton for all query terms: a single sweep per chunk counts
+        # every term occurrence instead of one str.count pass per term
+        automaton = None
+        if AHOCORASICK_AVAILABLE and query_terms:
+            automaton = ahocorasick.Automaton()
+            for term in query_terms:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+        
+        scored = np.empty(len(chunks), dtype=_SCORE_DTYPE)
         for i, chunk in enumerate(chunks):
-            chunk_lower = chunk.lower()
-            chunk_words = set(re.findall(r'\w+', chunk_lower))
-            
-            # Keyword overlap
-            overlap = len(query_terms & chunk_words)
+            chunk_lower = chunks_lower[i]
+            # Keyword overlap; only query words are kept, so the set never
+            # grows past len(query_terms)
+            seen = set()
+            if query_terms:
+                for m in _WORD_RE.finditer(chunk_lower):
+                    word = m.group()
+                    if word in query_terms:
+                        seen.add(word)
+            overlap = len(seen)
             
             # Term frequency
-            term_freq = sum(chunk_lower.count(term) for term in query_terms)
+            if automaton is not None:
+                term_freq = count_terms(automaton, chunk_lower)
+            else:
+                term_freq = sum(chunk_lower.count(term) for term in query_terms)
             
             # Position bonus (early chunks more relevant)
             position_score = 1.0 / (i + 1)
@@ -173,22 +287,14 @@ class AdvancedContextManager:
                 length_score * 2
             )
             
-            scored.append({
-                'content': chunk,
-                'chunk_id': i,
-                'relevance': relevance,
-                'overlap': overlap,
-                'term_freq': term_freq
-            })
-        
-        # Sort by relevance
-        scored.sort(key=lambda x: x['relevance'], reverse=True)
+            scored[i] = (relevance, overlap, term_freq)
         
         return scored
     
     @staticmethod
     def _select_with_context(
-        scored_chunks: List[Dict],
+        chunks: List[str],
+        scored: np.ndarray,
         max_chunks: int,
         char_limit: int
     ) -> List[Dict]:
@@ -197,39 +303,56 @@ class AdvancedContextManager:
         
         Ensures chunks are contiguous when possible for better coherence
         """
-        if len(scored_chunks) <= max_chunks:
+        # Stable descending sort keeps ties in document order
+        order = np.argsort(-scored['relevance'], kind='stable')
+        
+        if len(chunks) <= max_chunks:
             # Return all chunks
-            for i, chunk in enumerate(scored_chunks):
-                chunk['is_complete'] = True
-            return scored_chunks
+            return [
+                AdvancedContextManager._chunk_record(chunks, scored, chunk_id, True)
+                for chunk_id in order.tolist()
+            ]
         
-        # Select top chunks
-        selected_ids = set([chunk['chunk_id'] for chunk in scored_chunks[:max_chunks]])
+        # Select top chunks; selected ids are bits of a Python int
+        top = order[:max_chunks].tolist()
+        selected_mask = 0
+        for chunk_id in top:
+            selected_mask |= 1 << chunk_id
         
         # Add adjacent chunks if they fit
-        total_size = sum(len(chunk['content']) for chunk in scored_chunks[:max_chunks])
+        total_size = sum(len(chunks[chunk_id]) for chunk_id in top)
         
-        for chunk in scored_chunks[max_chunks:]:
-            chunk_id = chunk['chunk_id']
+        for chunk_id in order[max_chunks:].tolist():
+            # Check if adjacent to selected (bits chunk_id - 1 and chunk_id + 1)
+            if chunk_id:
+                adjacent = (selected_mask >> (chunk_id - 1)) & 0b101
+            else:
+                adjacent = selected_mask & 0b10
             
-            # Check if adjacent to selected
-            if any(abs(chunk_id - sid) == 1 for sid in selected_ids):
-                if total_size + len(chunk['content']) < char_limit:
-                    selected_ids.add(chunk_id)
-                    total_size += len(chunk['content'])
-        
-        # Build final selection
-        selected = [chunk for chunk in scored_chunks if chunk['chunk_id'] in selected_ids]
-        selected.sort(key=lambda x: x['chunk_id'])  # Sort by original order
-        
-        # Mark completeness
-        all_ids = set(range(len(scored_chunks)))
-        is_complete = selected_ids == all_ids
-        
-        for chunk in selected:
-            chunk['is_complete'] = is_complete
-        
-        return selected
+            if adjacent and total_size + len(chunks[chunk_id]) < char_limit:
+                selected_mask |= 1 << chunk_id
+                total_size += len(chunks[chunk_id])
+        
+        # Build final selection in original order and mark completeness
+        is_complete = selected_mask == (1 << len(chunks)) - 1
+        return [
+            AdvancedContextManager._chunk_record(chunks, scored, chunk_id, is_complete)
+            for chunk_id in range(len(chunks))
+            if (selected_mask >> chunk_id) & 1
+        ]
+    
+    @staticmethod
+    def _chunk_record(chunks: List[str], scored: np.ndarray, chunk_id: int, is_complete: bool) -> Dict[str, Any]:
+        """Materialize the public chunk dict for one selected chunk id"""
+        row = scored[chunk_id]
+        return {
+            'content': chunks[chunk_id],
+            'chunk_id': chunk_id,
+            'relevance': float(row['relevance']),
+            'overlap': int(row['overlap']),
+            'term_freq': int(row['term_freq']),
+            'is_complete': is_complete
+        }
     
     @staticmethod
     def create_multi_pass_strategy(
@@ -268,35 +391,39 @@ class AdvancedContextManager:
         Keeps high-relevance passages intact, summarizes low-relevance
         """
         # Split into sentences
-        sentences = re.split(r'([.!?]+\s+)', content)
+        sentences = _SENT_RE.split(content)
         
-        query_terms = set(re.findall(r'\w+', query.lower()))
+        query_terms = set(_WORD_RE.findall(query.lower()))
         
-        # Score each sentence
-        scored_sentences = []
+        # Score each sentence (kept in original order, so index == position)
+        by_index = []
         for i in range(0, len(sentences), 2):
             sent = sentences[i]
             punct = sentences[i+1] if i+1 < len(sentences) else ""
-            full_sent = sent + punct
             
-            sent_lower = sent.lower()
-            overlap = sum(1 for term in query_terms if term in sent_lower)
-            
-            scored_sentences.append({
-                'text': full_sent,
-                'relevance': overlap,
+            by_index.append({
+                'text': sent + punct,
+                'relevance': 0,
                 'index': i // 2
             })
         
-        # Sort by relevance
-        scored_sentences.sort(key=lambda x: x['relevance'], reverse=True)
+        lows = [sentences[i].lower() for i in range(0, len(sentences), 2)]
+        scores = np.zeros(len(lows), dtype=np.int32)
+        for term in query_terms:
+            scores += np.fromiter((term in low for low in lows), dtype=np.int32, count=len(lows))
+        for sent, score in zip(by_index, scores.tolist()):
+            sent['relevance'] = score
+        
+        # Sort by relevance (stable, like list.sort)
+        order = np.argsort(-scores, kind='stable').tolist()
         
         # Keep high-relevance sentences + some context
         kept = []
         current_size = 0
         kept_indices = set()
         
-        for sent in scored_sentences:
+        for idx in order:
+            sent = by_index[idx]
             if current_size + len(sent['text']) < target_size:
                 kept.append(sent)
                 kept_indices.add(sent['index'])
@@ -304,9 +431,9 @@ class AdvancedContextManager:
                 
                 # Add adjacent sentences for context
                 for adj in [sent['index'] - 1, sent['index'] + 1]:
-                    if adj >= 0 and adj < len(scored_sentences) and adj not in kept_indices:
-                        adj_sent = next((s for s in scored_sentences if s['index'] == adj), None)
-                        if adj_sent and current_size + len(adj_sent['text']) < target_size:
+                    if adj >= 0 and adj < len(by_index) and adj not in kept_indices:
+                        adj_sent = by_index[adj]
+                        if current_size + len(adj_sent['text']) < target_size:
                             kept.append(adj_sent)
                             kept_indices.add(adj)
                             current_size += len(adj_sent['text'])
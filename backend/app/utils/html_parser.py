@@ -4,14 +4,301 @@ Advanced HTML Parser with link extraction and structured data parsing
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 from urllib.parse import urljoin, urlparse
-from typing import Dict, List
-from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from heapq import nlargest
+from itertools import islice
+from operator import itemgetter
 from loguru import logger
+import copy
+import hashlib
+import os
 import re
 
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# C tree builder when available; the pure-Python parser otherwise
+SOUP_FEATURES = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+# Single-pass index: tag name -> index buckets it belongs to
+_HEADING_LEVELS = {f'h{level}': level for level in range(1, 7)}
+_CONTAINER_TAGS = frozenset({'div', 'article', 'li', 'section'})
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+_DROPPED_TAGS = ['script', 'style', 'nav', 'footer', 'header']
+_ARTICLE_TAGS = frozenset({'article', 'main', 'div'})
+_TABLE_SECTIONS = frozenset({'thead', 'tbody', 'tfoot'})
+_CELL_TAGS = frozenset({'td', 'th'})
+
+# Inline/text elements never treated as repeating containers
+_SKIP_TAGS = frozenset({'span', 'a', 'i', 'b', 'strong', 'em', 'small'})
+
+# Class substrings that mark article-like content (matched case-insensitively)
+_ARTICLE_KEYWORDS = ('article', 'post', 'content', 'entry')
+
+# Lowercased titles that mark navigation rather than content
+_NAV_TITLES = frozenset({'home', 'login', 'signup', 'menu', 'search', 'next', 'previous', 'close'})
+_CONTAINER_NAV_TITLES = frozenset({'home', 'login', 'signup', 'menu', 'search'})
+
+# Patterns used in the per-element loops, compiled once
+_WS_RE = re.compile(r'\s+')
+_NUM_RE = re.compile(r'[\d,]+\.?\d*')
+# Non-http links and common non-content links, matched in one case-insensitive pass
+_SKIP_URL_RE = re.compile(r'^(?:javascript:|mailto:)|login|signin|register|cart|checkout', re.I)
+
+# Row types the extractors build; pages can yield thousands of rows, so they
+# are slotted and only turned into dicts once, when a result is handed out
+@dataclass(slots=True)
+class Link:
+    url: str
+    text: str
+    title: str
+    context: str
+    domain: str
+    relevance: str
+    
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "text": self.text,
+            "title": self.title,
+            "context": self.context,
+            "domain": self.domain,
+            "relevance": self.relevance
+        }
+
+@dataclass(slots=True)
+class Item:
+    title: str
+    link: Optional[str]
+    context: str
+    metadata: Dict
+    source: Optional[str] = None  # set on DOM-similarity items
+    container_type: Optional[str] = None  # set on container/table-row items
+    
+    def to_dict(self) -> Dict:
+        # Copy list values (table_data) so callers cannot reach cached rows
+        metadata = {key: value[:] if isinstance(value, list) else value
+                    for key, value in self.metadata.items()}
+        if self.source is not None:
+            return {
+                'title': self.title,
+                'link': self.link,
+                'context': self.context,
+                'metadata': metadata,
+                'source': self.source
+            }
+        return {
+            'title': self.title,
+            'link': self.link,
+            'metadata': metadata,
+            'context': self.context,
+            'container_type': self.container_type
+        }
+
+def _netloc_end(url: str, start: int) -> int:
+    """End of the authority that starts at url[start] (next '/', '?' or '#')."""
+    end = len(url)
+    for delimiter in '/?#':
+        pos = url.find(delimiter, start, end)
+        if pos != -1:
+            end = pos
+    return end
+
+def _needs_urljoin(href: str) -> bool:
+    """
+    True when urljoin would rewrite href beyond prefixing the base: empty
+    query/fragment/params markers, or tab/newline characters it strips.
+    """
+    return (
+        not href or href[-1] in '?#;' or '?#' in href or ';?' in href or ';#' in href
+        or '\t' in href or '\r' in href or '\n' in href
+    )
+
+def _url_resolver(base_url: str):
+    """
+    Build resolve(href) -> (absolute_url, netloc) for one base URL.
+    The base is parsed once; absolute, protocol-relative and root-relative
+    hrefs are resolved with string ops, anything else goes through urljoin.
+    """
+    base = urlparse(base_url)
+    fast = base.scheme in ('http', 'https') and bool(base.netloc)
+    base_root = f"{base.scheme}://{base.netloc}"
+    
+    def resolve(href: str):
+        if fast and not _needs_urljoin(href):
+            if href.startswith(('http://', 'https://')):
+                start = href.index('//') + 2
+                netloc = href[start:_netloc_end(href, start)]
+                if netloc:
+                    return href, netloc
+            elif href.startswith('//'):
+                netloc = href[2:_netloc_end(href, 2)]
+                if netloc:
+                    return f"{base.scheme}:{href}", netloc
+            elif href.startswith('/') and '/.' not in href:
+                # Root-relative without dot segments: nothing to normalize
+                return base_root + href, base.netloc
+        
+        absolute_url = urljoin(base_url, href)
+        return absolute_url, urlparse(absolute_url).netloc
+    
+    return resolve
+
+_EMPTY = ()
+
+def _class_key(tag: Tag) -> str:
+    """First 30 chars of a tag's joined class list, without joining single classes."""
+    cs = tag.attrs.get('class')
+    if not cs:
+        return ''
+    if len(cs) == 1:
+        return cs[0][:30]
+    return ' '.join(cs)[:30]
+
+def _dedup_key(text: str, length: int = 80) -> int:
+    """Dedup key shared by the item extractors: hash of the first `length` chars."""
+    return hash(text[:length])
+
+class _SeenFilter:
+    """
+    Fixed-size Bloom-style filter for title dedup: two probes into a
+    1M-bit table, so memory stays constant however many items a page has.
+    """
+    
+    __slots__ = ('bits',)
+    
+    INDEX_BITS = 20
+    MASK = (1 << INDEX_BITS) - 1
+    
+    def __init__(self):
+        self.bits = bytearray((1 << self.INDEX_BITS) >> 3)
+    
+    def add(self, h: int) -> bool:
+        """Record a _dedup_key; False if it was (probably) seen before."""
+        # Keys are 64-bit str hashes; split into two probes
+        i1 = h & self.MASK
+        i2 = (h >> self.INDEX_BITS) & self.MASK
+        bits = self.bits
+        
+        seen = (bits[i1 >> 3] >> (i1 & 7)) & (bits[i2 >> 3] >> (i2 & 7)) & 1
+        if seen:
+            return False
+        
+        bits[i1 >> 3] |= 1 << (i1 & 7)
+        bits[i2 >> 3] |= 1 << (i2 & 7)
+        return True
+
+def _html_digest(html_content: str):
+    """Fast fingerprint of a page for the parse cache."""
+    data = html_content.encode('utf-8', 'surrogatepass')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh64(data).intdigest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+class _ParseCache:
+    """
+    LRU of parse() results keyed by (page digest, base_url), bounded both by
+    entry count and by the total size of the pages behind the entries.
+    """
+    
+    def __init__(self, max_entries: int = 256, max_chars: int = 64_000_000):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.total_chars = 0
+        self._entries: "OrderedDict[Tuple, Tuple[int, Dict]]" = OrderedDict()
+    
+    def get(self, key: Tuple) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    def put(self, key: Tuple, size: int, result: Dict):
+        if size > self.max_chars:
+            return
+        
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.total_chars -= old[0]
+        
+        self._entries[key] = (size, result)
+        self.total_chars += size
+        
+        while len(self._entries) > self.max_entries or self.total_chars > self.max_chars:
+            _, (evicted_size, _) = self._entries.popitem(last=False)
+            self.total_chars -= evicted_size
+
+_PARSE_CACHE = _ParseCache()
+
+def _cached_text(element: Tag, cache: Optional[Dict], separator: str = '') -> str:
+    """
+    element.get_text(separator, strip=True), memoized for one parse() call.
+    The same subtrees are read by several extractors; each get_text re-walks them.
+    """
+    if cache is None:
+        return element.get_text(separator=separator, strip=True)
+    
+    key = (id(element), separator)
+    text = cache.get(key)
+    if text is None:
+        text = element.get_text(separator=separator, strip=True)
+        cache[key] = text
+    return text
+
+def _is_article_class(classes) -> bool:
+    """Substring test for _ARTICLE_KEYWORDS, without the regex engine."""
+    if not classes:
+        return False
+    joined = ' '.join(classes).lower()
+    return any(keyword in joined for keyword in _ARTICLE_KEYWORDS)
+
+def _table_rows(section: Tag) -> Iterable[Tag]:
+    """
+    <tr> children of a table or row group, walking direct children only.
+    A bare table's row groups are entered once; nested tables are not.
+    """
+    for child in section.children:
+        name = child.name  # None for strings and comments
+        if name == 'tr':
+            yield child
+        elif name in _TABLE_SECTIONS:
+            yield from _table_rows(child)
+
+def _row_cells(tr: Tag) -> List[Tag]:
+    """<td>/<th> children of a row, without searching inside the cells."""
+    return [cell for cell in tr.children if cell.name in _CELL_TAGS]
+
 class EnhancedHTMLParser:
     """Parse HTML and extract structured data including links"""
     
+    # Below this many DOM-similarity items, also scan classed containers
+    MIN_DOM_ITEMS = 5
+    # Upper bound on containers probed by that scan
+    MAX_CONTAINERS = 2000
+    # text_content is cut at this many characters
+    MAX_TEXT_CHARS = 2_000_000
+    # Article scan stops after this many accepted articles
+    MAX_ARTICLES = 50
+    
     @staticmethod
     def parse(html_content: str, base_url: str) -> Dict:
         """
@@ -26,34 +313,47 @@ class EnhancedHTMLParser:
             }
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Retries and revisits often hand over the same page again
+            cache_key = (_html_digest(html_content), base_url)
+            cached = _PARSE_CACHE.get(cache_key)
+            if cached is not None:
+                return EnhancedHTMLParser._export(cached)
+            
+            # Full tree: text_content needs every text container, not just
+            # the tags the link/structure extractors read
+            soup = BeautifulSoup(html_content, SOUP_FEATURES)
             
-            # Remove script and style elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header']):
+            # Remove script and style elements (and chrome)
+            for element in soup(_DROPPED_TAGS):
                 element.decompose()
             
+            # Walk the tree once; every extractor reads from this index
+            index = EnhancedHTMLParser._single_pass(soup)
+            
             # Extract links
-            links = EnhancedHTMLParser._extract_links(soup, base_url)
+            links = EnhancedHTMLParser._extract_links(soup, base_url, index)
             
             # Extract structured data
-            structured_data = EnhancedHTMLParser._extract_structured_data(soup)
+            structured_data = EnhancedHTMLParser._extract_structured_data(soup, index)
             
             # Extract metadata
-            metadata = EnhancedHTMLParser._extract_metadata(soup)
+            metadata = EnhancedHTMLParser._extract_metadata(soup, index)
             
             # Get clean text
-            text_content = soup.get_text(separator='\n', strip=True)
+            text_content = EnhancedHTMLParser._bounded_text(soup, EnhancedHTMLParser.MAX_TEXT_CHARS)
             
             # Extract ALL structured items (UNIVERSAL - not company-specific)
-            structured_items = EnhancedHTMLParser._extract_structured_items(soup, base_url)
+            structured_items = EnhancedHTMLParser._extract_structured_items(soup, base_url, index)
             
-            return {
+            result = {
                 "text_content": text_content,
                 "links": links,
                 "structured_data": structured_data,
                 "metadata": metadata,
                 "structured_items": structured_items  # GENERIC items extraction
             }
+            _PARSE_CACHE.put(cache_key, len(html_content), result)
+            return EnhancedHTMLParser._export(result)
             
         except Exception as e:
             logger.error(f"HTML parsing error: {e}")
@@ -65,34 +365,175 @@ class EnhancedHTMLParser:
             }
     
     @staticmethod
-    def _extract_links(soup: BeautifulSoup, base_url: str) -> List[Dict]:
+    def parse_fast(html_content: str, base_url: str) -> Dict:
+        """
+        Same result shape as parse(), built on selectolax's Lexbor (C) parser
+        instead of BeautifulSoup. Falls back to parse() when selectolax is
+        not installed.
+        """
+        if not SELECTOLAX_AVAILABLE:
+            return EnhancedHTMLParser.parse(html_content, base_url)
+        
+        try:
+            tree = LexborHTMLParser(html_content)
+            tree.strip_tags(_DROPPED_TAGS)
+            text_cache = {}
+            
+            links = _fast_links(tree, base_url, text_cache)
+            structured_data = _fast_structured_data(tree, text_cache)
+            metadata = _fast_metadata(tree)
+            text_content = _fast_text(tree.root, None, '\n')[:EnhancedHTMLParser.MAX_TEXT_CHARS]
+            structured_items = _fast_structured_items(tree, base_url, text_cache)
+            
+            return EnhancedHTMLParser._export({
+                "text_content": text_content,
+                "links": links,
+                "structured_data": structured_data,
+                "metadata": metadata,
+                "structured_items": structured_items
+            })
+            
+        except Exception as e:
+            logger.error(f"HTML parsing error: {e}")
+            return {
+                "text_content": "",
+                "links": [],
+                "structured_data": {},
+                "metadata": {}
+            }
+    
+    @staticmethod
+    def parse_many(pages: Iterable[Tuple[str, str]], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Parse many (html_content, base_url) pages across worker processes.
+        
+        Parsing is CPU-bound and holds the GIL, so a process pool scales with
+        cores where threads would not. Results keep the input order.
+        """
+        pages = list(pages)
+        workers = min(max_workers or os.cpu_count() or 1, len(pages))
+        
+        if workers <= 1:
+            return [EnhancedHTMLParser.parse(html_content, base_url) for html_content, base_url in pages]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_parse_worker, pages, chunksize=8))
+    
+    @staticmethod
+    def _export(result: Dict) -> Dict:
+        """
+        Plain-dict copy of an extraction result, safe for callers to mutate.
+        Link/Item rows become dicts here and nowhere earlier.
+        """
+        return {
+            "text_content": result["text_content"],
+            "links": [link.to_dict() for link in result["links"]],
+            "structured_data": copy.deepcopy(result["structured_data"]),
+            "metadata": dict(result["metadata"]),
+            "structured_items": [item.to_dict() for item in result["structured_items"]]
+        }
+    
+    @staticmethod
+    def _bounded_text(soup: BeautifulSoup, limit: int) -> str:
+        """
+        soup.get_text(separator='\n', strip=True), capped at limit characters.
+        Strings are streamed and the walk stops once the cap is reached.
+        """
+        parts = []
+        size = 0
+        for string in soup.stripped_strings:
+            parts.append(string)
+            size += len(string) + 1
+            if size > limit:
+                break
+        return '\n'.join(parts)[:limit]
+    
+    @staticmethod
+    def _single_pass(soup: BeautifulSoup) -> Dict:
+        """
+        Walk the document once and bucket the tags each extractor needs,
+        in document order (replaces one find_all traversal per selector).
+        """
+        index = {
+            "tags": [],
+            "headings": {level: [] for level in range(1, 7)},
+            "lists": [],
+            "tables": [],
+            "articles": [],
+            "anchors": [],
+            "metas": [],
+            "title": None,
+            "canonical": None,
+            "containers": [],
+            "text_cache": {},
+        }
+        tags = index["tags"]
+        headings = index["headings"]
+        
+        for element in soup.descendants:
+            name = element.name
+            if name is None:  # Text, comments, doctype
+                continue
+            
+            tags.append(element)
+            attrs = element.attrs
+            
+            if name in _HEADING_LEVELS:
+                headings[_HEADING_LEVELS[name]].append(element)
+            elif name == 'a':
+                if attrs.get('href') is not None:
+                    index["anchors"].append(element)
+            elif name == 'ul' or name == 'ol':
+                index["lists"].append(element)
+            elif name == 'table':
+                index["tables"].append(element)
+            elif name == 'meta':
+                index["metas"].append(element)
+            elif name == 'title':
+                if index["title"] is None:
+                    index["title"] = element
+            elif name == 'link':
+                if index["canonical"] is None and 'canonical' in (attrs.get('rel') or ()):
+                    index["canonical"] = element
+            
+            if attrs.get('class') is not None:
+                if name in _CONTAINER_TAGS:
+                    index["containers"].append(element)
+                if name in _ARTICLE_TAGS:
+                    index["articles"].append(element)
+        
+        return index
+    
+    @staticmethod
+    def _extract_links(soup: BeautifulSoup, base_url: str, index: Optional[Dict] = None) -> List[Link]:
         """Extract all links with context and relevance scoring"""
+        if index is None:
+            index = EnhancedHTMLParser._single_pass(soup)
+        
+        text_cache = index["text_cache"]
+        resolve = _url_resolver(base_url)
         links = []
         seen_urls = set()
         
-        for a_tag in soup.find_all('a', href=True):
+        for a_tag in index["anchors"]:
             href = a_tag['href']
             
             # Convert relative URLs to absolute
-            absolute_url = urljoin(base_url, href)
-            
-            # Skip duplicates, anchors, and non-http links
-            if absolute_url in seen_urls or absolute_url.startswith(('#', 'javascript:', 'mailto:')):
-                continue
+            absolute_url, domain = resolve(href)
             
-            # Skip common non-content links
-            if any(skip in absolute_url.lower() for skip in ['login', 'signin', 'register', 'cart', 'checkout']):
+            # Skip duplicates, anchors, non-http links and common non-content links
+            if absolute_url in seen_urls or absolute_url.startswith('#') or _SKIP_URL_RE.search(absolute_url):
                 continue
             
             seen_urls.add(absolute_url)
             
             # Get link text and surrounding context
-            link_text = a_tag.get_text(strip=True)
+            link_text = _cached_text(a_tag, text_cache)
             
             # Get parent context for relevance
             parent_text = ""
             if a_tag.parent:
-                parent_text = a_tag.parent.get_text(strip=True)[:200]
+                parent_text = _cached_text(a_tag.parent, text_cache)[:200]
             
             # Calculate relevance score
             relevance = "low"
@@ -101,20 +542,24 @@ class EnhancedHTMLParser:
             if a_tag.get('title') or (link_text and len(link_text) > 20):
                 relevance = "high"
             
-            links.append({
-                "url": absolute_url,
-                "text": link_text[:200] if link_text else "No text",
-                "title": a_tag.get('title', ''),
-                "context": parent_text,
-                "domain": urlparse(absolute_url).netloc,
-                "relevance": relevance
-            })
+            links.append(Link(
+                url=absolute_url,
+                text=link_text[:200] if link_text else "No text",
+                title=a_tag.get('title', ''),
+                context=parent_text,
+                domain=domain,
+                relevance=relevance
+            ))
         
         return links
     
     @staticmethod
-    def _extract_structured_data(soup: BeautifulSoup) -> Dict:
+    def _extract_structured_data(soup: BeautifulSoup, index: Optional[Dict] = None) -> Dict:
         """Extract structured data from common HTML patterns"""
+        if index is None:
+            index = EnhancedHTMLParser._single_pass(soup)
+        
+        text_cache = index["text_cache"]
         structured = {
             "headings": [],
             "lists": [],
@@ -124,15 +569,15 @@ class EnhancedHTMLParser:
         
         # Extract headings hierarchy
         for level in range(1, 7):
-            for heading in soup.find_all(f'h{level}'):
+            for heading in index["headings"][level]:
                 structured["headings"].append({
                     "level": level,
-                    "text": heading.get_text(strip=True)
+                    "text": _cached_text(heading, text_cache)
                 })
         
         # Extract lists
-        for ul in soup.find_all(['ul', 'ol']):
-            items = [li.get_text(strip=True) for li in ul.find_all('li', recursive=False)]
+        for ul in index["lists"]:
+            items = [_cached_text(li, text_cache) for li in ul.find_all('li', recursive=False)]
             if items:
                 structured["lists"].append({
                     "type": ul.name,
@@ -140,25 +585,31 @@ class EnhancedHTMLParser:
                 })
         
         # Extract tables
-        for table in soup.find_all('table'):
-            table_data = EnhancedHTMLParser._parse_table(table)
+        for table in index["tables"]:
+            table_data = EnhancedHTMLParser._parse_table(table, text_cache)
             if table_data:
                 structured["tables"].append(table_data)
         
         # Extract article-like content
-        for article in soup.find_all(['article', 'main', 'div'], class_=re.compile(r'(article|post|content|entry)', re.I)):
-            text = article.get_text(strip=True)
+        articles = structured["articles"]
+        for article in index["articles"]:
+            classes = article.get('class')
+            if not _is_article_class(classes):
+                continue
+            text = _cached_text(article, text_cache)
             if len(text) > 200:  # Substantial content
-                structured["articles"].append({
+                articles.append({
                     "text": text[:1000],  # First 1000 chars
                     "tag": article.name,
-                    "class": ' '.join(article.get('class', []))
+                    "class": ' '.join(classes)
                 })
+                if len(articles) >= EnhancedHTMLParser.MAX_ARTICLES:
+                    break
         
         return structured
     
     @staticmethod
-    def _parse_table(table) -> Dict:
+    def _parse_table(table, text_cache: Optional[Dict] = None) -> Dict:
         """Parse HTML table into structured format"""
         try:
             rows = []
@@ -167,15 +618,15 @@ class EnhancedHTMLParser:
             # Try to find headers
             thead = table.find('thead')
             if thead:
-                header_cells = thead.find_all(['th', 'td'])
-                headers = [cell.get_text(strip=True) for cell in header_cells]
+                headers = [_cached_text(cell, text_cache)
+                           for tr in _table_rows(thead) for cell in _row_cells(tr)]
             
             # Get data rows
             tbody = table.find('tbody') or table
-            for tr in tbody.find_all('tr')[:50]:  # Limit to 50 rows
-                cells = tr.find_all(['td', 'th'])
+            for tr in islice(_table_rows(tbody), 50):  # Limit to 50 rows
+                cells = _row_cells(tr)
                 if cells:
-                    row_data = [cell.get_text(strip=True) for cell in cells]
+                    row_data = [_cached_text(cell, text_cache) for cell in cells]
                     rows.append(row_data)
             
             if not headers and rows:
@@ -193,31 +644,34 @@ class EnhancedHTMLParser:
             return {}
     
     @staticmethod
-    def _extract_metadata(soup: BeautifulSoup) -> Dict:
+    def _extract_metadata(soup: BeautifulSoup, index: Optional[Dict] = None) -> Dict:
         """Extract page metadata"""
+        if index is None:
+            index = EnhancedHTMLParser._single_pass(soup)
+        
         metadata = {}
         
         # Title
-        title_tag = soup.find('title')
+        title_tag = index["title"]
         if title_tag:
             metadata['title'] = title_tag.get_text(strip=True)
         
         # Meta tags
-        for meta in soup.find_all('meta'):
+        for meta in index["metas"]:
             name = meta.get('name') or meta.get('property')
             content = meta.get('content')
             if name and content:
                 metadata[name] = content
         
         # Canonical URL
-        canonical = soup.find('link', rel='canonical')
+        canonical = index["canonical"]
         if canonical:
             metadata['canonical_url'] = canonical.get('href')
         
         return metadata
     
     @staticmethod
-    def _extract_by_dom_similarity(soup: BeautifulSoup, base_url: str) -> List[Dict]:
+    def _extract_by_dom_similarity(soup: BeautifulSoup, base_url: str, index: Optional[Dict] = None) -> List[Item]:
         """
         ADVANCED ALGORITHM: DOM Tree Similarity Detection
         
@@ -228,18 +682,18 @@ class EnhancedHTMLParser:
         
         This finds data cards, product listings, article grids, etc. AUTOMATICALLY
         """
+        if index is None:
+            index = EnhancedHTMLParser._single_pass(soup)
+        
         items = []
-        seen_content = set()
+        seen_content = _SeenFilter()
         
         # STEP 1: Build DOM signatures (tag + class structure)
         signature_map = defaultdict(list)
         
-        for element in soup.find_all(True):  # All tags
-            if not isinstance(element, Tag):
-                continue
-            
+        for element in index["tags"]:  # All tags (the index holds Tags only)
             # Skip inline/text elements
-            if element.name in ['span', 'a', 'i', 'b', 'strong', 'em', 'small']:
+            if element.name in _SKIP_TAGS:
                 continue
             
             # Build structural signature
@@ -254,53 +708,55 @@ class EnhancedHTMLParser:
             if len(elements) < 3:  # Must repeat at least 3 times
                 continue
             
-            logger.info(f"Pattern '{signature[:50]}...' appears {len(elements)} times")
+            logger.info(f"Pattern '{'.'.join(signature)[:50]}...' appears {len(elements)} times")
             
             # STEP 3: Extract data from each instance
             for element in elements[:200]:  # Limit per pattern
-                item = EnhancedHTMLParser._extract_item_from_element(element, base_url)
+                item = EnhancedHTMLParser._extract_item_from_element(element, base_url, index["text_cache"])
                 
-                if item and item['title']:
-                    # Intelligent deduplication using content hash
-                    content_hash = hash(item['title'][:100])
-                    if content_hash not in seen_content:
-                        seen_content.add(content_hash)
+                if item and item.title:
+                    # Intelligent deduplication on the title prefix
+                    if seen_content.add(_dedup_key(item.title, 100)):
                         items.append(item)
         
         logger.info(f"Extracted {len(items)} unique items using DOM similarity")
         return items
     
     @staticmethod
-    def _get_dom_signature(element: Tag) -> str:
+    def _get_dom_signature(element: Tag) -> Tuple[str, ...]:
         """
         Create structural signature for DOM element.
         Elements with same signature likely contain similar data.
         
-        Signature format: tag.class1.class2>child_tag>child_tag
+        Signature format: (tag, class1, class2, '>child_tag', '>child_tag');
+        kept as a tuple since it is only hashed, never displayed
         """
         try:
             # Element's own structure
-            classes = element.get('class', [])
+            classes = element.get('class') or _EMPTY
             sig_parts = [element.name]
             
             # Add class names (sorted for consistency)
             if classes:
                 sig_parts.extend(sorted(classes)[:3])  # Max 3 classes
             
-            # Add child structure (2 levels deep)
-            children = [child.name for child in element.children if isinstance(child, Tag)]
-            if children:
-                child_counts = Counter(children)
-                # Add most common children
-                for child_tag, count in child_counts.most_common(3):
-                    sig_parts.append(f">{child_tag}")
+            # Add child structure (2 levels deep), counted in one pass
+            child_counts = {}
+            for child in element.children:
+                name = child.name
+                if name is not None:
+                    child_counts[name] = child_counts.get(name, 0) + 1
+            
+            # Add most common children (ties keep first-seen order)
+            for child_tag, count in nlargest(3, child_counts.items(), key=itemgetter(1)):
+                sig_parts.append(f">{child_tag}")
             
-            return '.'.join(sig_parts)
+            return tuple(sig_parts)
         except:
-            return ""
+            return ()
     
     @staticmethod
-    def _extract_item_from_element(element: Tag, base_url: str) -> Dict:
+    def _extract_item_from_element(element: Tag, base_url: str, text_cache: Optional[Dict] = None) -> Optional[Item]:
         """
         Extract structured data from a single DOM element.
         Uses heuristics to find title, link, metadata.
@@ -310,7 +766,7 @@ class EnhancedHTMLParser:
             title = None
             title_tag = None
             
-            for tag_name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            for tag_name in HEADING_TAGS:
                 title_tag = element.find(tag_name)
                 if title_tag:
                     break
@@ -320,14 +776,14 @@ class EnhancedHTMLParser:
                 title_tag = element.find('a', href=True) or element.find('strong') or element.find('span')
             
             if title_tag:
-                title = title_tag.get_text(strip=True)
-                title = re.sub(r'\s+', ' ', title)
+                title = _cached_text(title_tag, text_cache)
+                title = _WS_RE.sub(' ', title)
             
             if not title or len(title) < 3:
                 return None
             
             # Skip navigation items
-            if title.lower() in ['home', 'login', 'signup', 'menu', 'search', 'next', 'previous', 'close']:
+            if title.lower() in _NAV_TITLES:
                 return None
             
             # Find associated link
@@ -337,63 +793,64 @@ class EnhancedHTMLParser:
                 link = urljoin(base_url, link_tag['href'])
             
             # Extract all text for context
-            context = element.get_text(separator=' ', strip=True)
-            context = re.sub(r'\s+', ' ', context)[:500]
+            context = _cached_text(element, text_cache, ' ')
+            context = _WS_RE.sub(' ', context)[:500]
             
             # Extract metadata (numbers, ratings, etc.)
             metadata = {}
             for tag in element.find_all(['span', 'div', 'p']):
-                text = tag.get_text(strip=True)
+                text = _cached_text(tag, text_cache)
                 # Find numbers
-                numbers = re.findall(r'[\d,]+\.?\d*', text)
-                if numbers:
-                    class_name = ' '.join(tag.get('class', []))[:30]
+                number = _NUM_RE.search(text)
+                if number:
+                    class_name = _class_key(tag)
                     if class_name:
-                        metadata[class_name] = numbers[0]
+                        metadata[class_name] = number.group()
             
-            return {
-                'title': title,
-                'link': link,
-                'context': context,
-                'metadata': metadata,
-                'source': 'dom_similarity'
-            }
+            return Item(
+                title=title,
+                link=link,
+                context=context,
+                metadata=metadata,
+                source='dom_similarity'
+            )
         except:
             return None
     
     @staticmethod
-    def _extract_structured_items(soup: BeautifulSoup, base_url: str) -> List[Dict]:
+    def _extract_structured_items(soup: BeautifulSoup, base_url: str, index: Optional[Dict] = None) -> List[Item]:
         """
         UNIVERSAL extraction of structured items from HTML.
         Works for ANY type of data (companies, products, articles, jobs, etc.)
         
         Detects repeating patterns automatically.
         """
+        if index is None:
+            index = EnhancedHTMLParser._single_pass(soup)
+        
+        text_cache = index["text_cache"]
         items = []
+        # Hashes of title prefixes: cheap to compare however long the title
         seen_texts = set()
         
         # Use DOM similarity algorithm for intelligent extraction
+        dom_items = []
         try:
-            dom_items = EnhancedHTMLParser._extract_by_dom_similarity(soup, base_url)
+            dom_items = EnhancedHTMLParser._extract_by_dom_similarity(soup, base_url, index)
             items.extend(dom_items)
             for item in dom_items:
-                if item.get('title'):
-                    seen_texts.add(item['title'][:100])
+                if item.title:
+                    seen_texts.add(_dedup_key(item.title))
         except Exception as e:
             logger.warning(f"DOM similarity extraction failed: {e}")
         
-        # Pattern 1: Find repeating container patterns
-        for tag_name in ['div', 'article', 'li', 'section']:
-            containers = soup.find_all(tag_name, class_=True)
-            
-            for container in containers:
+        # Pattern 1: Scan classed containers only when DOM similarity found
+        # too few items; both extract the same title/link/metadata shape
+        if len(dom_items) < EnhancedHTMLParser.MIN_DOM_ITEMS:
+            for container in index["containers"][:EnhancedHTMLParser.MAX_CONTAINERS]:
                 try:
-                    # Find title (any heading or prominent text)
-                    title_tag = None
-                    for h_tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                        title_tag = container.find(h_tag)
-                        if title_tag:
-                            break
+                    # Find title (first heading of any level, or prominent text)
+                    title_tag = container.find(HEADING_TAGS)
                     
                     if not title_tag:
                         title_tag = container.find('a', href=True) or container.find('strong')
@@ -401,16 +858,17 @@ class EnhancedHTMLParser:
                     if not title_tag:
                         continue
                     
-                    title_text = title_tag.get_text(strip=True)
-                    title_text = re.sub(r'\s+', ' ', title_text)
+                    title_text = _cached_text(title_tag, text_cache)
+                    title_text = _WS_RE.sub(' ', title_text)
                     
                     # Skip duplicates and navigation items
-                    if title_text in seen_texts or len(title_text) < 3:
+                    title_key = _dedup_key(title_text)
+                    if title_key in seen_texts or len(title_text) < 3:
                         continue
-                    if title_text.lower() in ['home', 'login', 'signup', 'menu', 'search']:
+                    if title_text.lower() in _CONTAINER_NAV_TITLES:
                         continue
                     
-                    seen_texts.add(title_text)
+                    seen_texts.add(title_key)
                     
                     # Extract associated link
                     link_tag = container.find('a', href=True)
@@ -421,39 +879,37 @@ class EnhancedHTMLParser:
                     
                     # Look for numeric values (ratings, prices, counts, etc)
                     for span in container.find_all(['span', 'div', 'p'], class_=True):
-                        text = span.get_text(strip=True)
+                        text = _cached_text(span, text_cache)
                         # Extract numbers (ratings, prices, etc)
-                        numeric_match = re.search(r'([\d,]+\.?\d*)', text)
+                        numeric_match = _NUM_RE.search(text)
                         if numeric_match:
-                            class_name = ' '.join(span.get('class', []))
-                            metadata[f'numeric_{class_name[:30]}'] = numeric_match.group(1)
+                            metadata[f'numeric_{_class_key(span)}'] = numeric_match.group()
                     
                     # Extract full text content for context
-                    full_text = container.get_text(separator=' ', strip=True)[:500]
+                    full_text = _cached_text(container, text_cache, ' ')[:500]
                     
-                    items.append({
-                        'title': title_text,
-                        'link': link_url,
-                        'metadata': metadata,
-                        'context': full_text,
-                        'container_type': tag_name
-                    })
+                    items.append(Item(
+                        title=title_text,
+                        link=link_url,
+                        context=full_text,
+                        metadata=metadata,
+                        container_type=container.name
+                    ))
                     
                 except Exception as e:
                     logger.debug(f"Error extracting item: {e}")
                     continue
         
         # Pattern 2: Extract from tables (universal format)
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            for row in rows[1:]:  # Skip header
-                cells = row.find_all(['td', 'th'])
+        for table in index["tables"]:
+            for row in islice(_table_rows(table), 1, None):  # Skip header
+                cells = _row_cells(row)
                 if cells and len(cells) >= 1:
-                    first_cell_text = cells[0].get_text(strip=True)
+                    first_cell_text = _cached_text(cells[0], text_cache)
                     
-                    if first_cell_text and len(first_cell_text) > 2 and first_cell_text not in seen_texts:
-                        seen_texts.add(first_cell_text)
+                    cell_key = _dedup_key(first_cell_text)
+                    if first_cell_text and len(first_cell_text) > 2 and cell_key not in seen_texts:
+                        seen_texts.add(cell_key)
                         
                         # Get link if exists
                         link = None
@@ -462,15 +918,326 @@ class EnhancedHTMLParser:
                             link = urljoin(base_url, link_tag['href'])
                         
                         # Extract all cell data
-                        cell_data = [cell.get_text(strip=True) for cell in cells]
+                        cell_data = [_cached_text(cell, text_cache) for cell in cells]
                         
-                        items.append({
-                            'title': first_cell_text,
-                            'link': link,
-                            'metadata': {'table_data': cell_data},
-                            'context': ' | '.join(cell_data),
-                            'container_type': 'table_row'
-                        })
+                        items.append(Item(
+                            title=first_cell_text,
+                            link=link,
+                            context=' | '.join(cell_data),
+                            metadata={'table_data': cell_data},
+                            container_type='table_row'
+                        ))
         
         logger.info(f"Extracted {len(items)} structured items (universal)")
         return items
+
+
+# selectolax ports of the EnhancedHTMLParser extractors, used by parse_fast.
+# Lexbor's css() includes the node itself, so descendant lookups go through
+# _fast_find/_fast_find_all to keep BeautifulSoup's find() semantics.
+
+def _fast_find_all(node, selector: str) -> List:
+    """Descendants of node matching selector, in document order."""
+    found = node.css(selector)
+    if found and found[0].mem_id == node.mem_id:
+        return found[1:]
+    return found
+
+def _fast_find(node, selector: str):
+    """First descendant of node matching selector, or None."""
+    for match in node.css(selector):
+        if match.mem_id != node.mem_id:
+            return match
+    return None
+
+def _fast_text(node, cache: Optional[Dict], separator: str = '') -> str:
+    """Equivalent of get_text(separator, strip=True), memoized per parse."""
+    key = (node.mem_id, separator)
+    text = cache.get(key) if cache is not None else None
+    if text is None:
+        if separator:
+            # Lexbor keeps strings that strip to empty; drop them like bs4 does
+            text = separator.join(part for part in node.text(separator='\x00', strip=True).split('\x00') if part)
+        else:
+            text = node.text(strip=True)
+        if cache is not None:
+            cache[key] = text
+    return text
+
+def _fast_classes(node) -> List[str]:
+    return (node.attributes.get('class') or '').split()
+
+def _fast_links(tree, base_url: str, text_cache: Dict) -> List[Link]:
+    resolve = _url_resolver(base_url)
+    links = []
+    seen_urls = set()
+    
+    for a_tag in tree.css('a[href]'):
+        attrs = a_tag.attributes
+        absolute_url, domain = resolve(attrs.get('href') or '')
+        
+        if absolute_url in seen_urls or absolute_url.startswith('#') or _SKIP_URL_RE.search(absolute_url):
+            continue
+        
+        seen_urls.add(absolute_url)
+        
+        link_text = _fast_text(a_tag, text_cache)
+        parent = a_tag.parent
+        parent_text = _fast_text(parent, text_cache)[:200] if parent is not None else ""
+        title = attrs.get('title') or ''
+        
+        relevance = "low"
+        if link_text and len(link_text) > 10:
+            relevance = "medium"
+        if title or (link_text and len(link_text) > 20):
+            relevance = "high"
+        
+        links.append(Link(
+            url=absolute_url,
+            text=link_text[:200] if link_text else "No text",
+            title=title,
+            context=parent_text,
+            domain=domain,
+            relevance=relevance
+        ))
+    
+    return links
+
+def _fast_structured_data(tree, text_cache: Dict) -> Dict:
+    structured = {
+        "headings": [],
+        "lists": [],
+        "tables": [],
+        "articles": []
+    }
+    
+    for level in range(1, 7):
+        for heading in tree.css(f'h{level}'):
+            structured["headings"].append({
+                "level": level,
+                "text": _fast_text(heading, text_cache)
+            })
+    
+    for ul in tree.css('ul, ol'):
+        items = [_fast_text(li, text_cache) for li in ul.iter() if li.tag == 'li']
+        if items:
+            structured["lists"].append({
+                "type": ul.tag,
+                "items": items[:20]
+            })
+    
+    for table in tree.css('table'):
+        table_data = _fast_parse_table(table, text_cache)
+        if table_data:
+            structured["tables"].append(table_data)
+    
+    articles = structured["articles"]
+    for article in tree.css('article[class], main[class], div[class]'):
+        classes = _fast_classes(article)
+        if not _is_article_class(classes):
+            continue
+        text = _fast_text(article, text_cache)
+        if len(text) > 200:
+            articles.append({
+                "text": text[:1000],
+                "tag": article.tag,
+                "class": ' '.join(classes)
+            })
+            if len(articles) >= EnhancedHTMLParser.MAX_ARTICLES:
+                break
+    
+    return structured
+
+def _fast_table_rows(section) -> Iterable:
+    for child in section.iter():
+        if child.tag == 'tr':
+            yield child
+        elif child.tag in _TABLE_SECTIONS:
+            yield from _fast_table_rows(child)
+
+def _fast_row_cells(tr) -> List:
+    return [cell for cell in tr.iter() if cell.tag in _CELL_TAGS]
+
+def _fast_parse_table(table, text_cache: Dict) -> Dict:
+    headers = []
+    thead = _fast_find(table, 'thead')
+    if thead is not None:
+        headers = [_fast_text(cell, text_cache)
+                   for tr in _fast_table_rows(thead) for cell in _fast_row_cells(tr)]
+    
+    # Lexbor always wraps rows in a tbody, as browsers do
+    tbody = _fast_find(table, 'tbody') or table
+    rows = []
+    for tr in islice(_fast_table_rows(tbody), 50):
+        cells = _fast_row_cells(tr)
+        if cells:
+            rows.append([_fast_text(cell, text_cache) for cell in cells])
+    
+    if not headers and rows:
+        headers = rows[0]
+        rows = rows[1:]
+    
+    return {
+        "headers": headers,
+        "rows": rows,
+        "row_count": len(rows)
+    }
+
+def _fast_metadata(tree) -> Dict:
+    metadata = {}
+    
+    title_tag = tree.css_first('title')
+    if title_tag is not None:
+        metadata['title'] = title_tag.text(strip=True)
+    
+    for meta in tree.css('meta'):
+        attrs = meta.attributes
+        name = attrs.get('name') or attrs.get('property')
+        content = attrs.get('content')
+        if name and content:
+            metadata[name] = content
+    
+    canonical = tree.css_first('link[rel~="canonical"]')
+    if canonical is not None:
+        metadata['canonical_url'] = canonical.attributes.get('href')
+    
+    return metadata
+
+def _fast_signature(node) -> Tuple[str, ...]:
+    sig_parts = [node.tag]
+    classes = _fast_classes(node)
+    if classes:
+        sig_parts.extend(sorted(classes)[:3])
+    
+    child_counts = {}
+    for child in node.iter(include_text=True):
+        if child.is_element_node:
+            child_counts[child.tag] = child_counts.get(child.tag, 0) + 1
+    for child_tag, count in nlargest(3, child_counts.items(), key=itemgetter(1)):
+        sig_parts.append(f">{child_tag}")
+    
+    return tuple(sig_parts)
+
+def _fast_item(node, base_url: str, text_cache: Dict) -> Optional[Item]:
+    title_tag = None
+    for tag_name in HEADING_TAGS:
+        title_tag = _fast_find(node, tag_name)
+        if title_tag is not None:
+            break
+    if title_tag is None:
+        title_tag = _fast_find(node, 'a[href]') or _fast_find(node, 'strong') or _fast_find(node, 'span')
+    if title_tag is None:
+        return None
+    
+    title = _WS_RE.sub(' ', _fast_text(title_tag, text_cache))
+    if len(title) < 3 or title.lower() in _NAV_TITLES:
+        return None
+    
+    link_tag = _fast_find(node, 'a[href]')
+    link = urljoin(base_url, link_tag.attributes.get('href') or '') if link_tag is not None else None
+    context = _WS_RE.sub(' ', _fast_text(node, text_cache, ' '))[:500]
+    
+    metadata = {}
+    for tag in _fast_find_all(node, 'span, div, p'):
+        number = _NUM_RE.search(_fast_text(tag, text_cache))
+        if number:
+            class_name = ' '.join(_fast_classes(tag))[:30]
+            if class_name:
+                metadata[class_name] = number.group()
+    
+    return Item(
+        title=title,
+        link=link,
+        context=context,
+        metadata=metadata,
+        source='dom_similarity'
+    )
+
+def _fast_structured_items(tree, base_url: str, text_cache: Dict) -> List[Item]:
+    items = []
+    seen_texts = set()
+    
+    # DOM similarity: group elements by structural signature
+    signature_map = defaultdict(list)
+    for node in tree.root.traverse():
+        if not node.is_element_node or node.tag in _SKIP_TAGS:
+            continue
+        signature_map[_fast_signature(node)].append(node)
+    
+    seen_content = _SeenFilter()
+    dom_items = []
+    for signature, nodes in signature_map.items():
+        if len(nodes) < 3:
+            continue
+        for node in nodes[:200]:
+            item = _fast_item(node, base_url, text_cache)
+            if item and seen_content.add(_dedup_key(item.title, 100)):
+                dom_items.append(item)
+    
+    items.extend(dom_items)
+    for item in dom_items:
+        seen_texts.add(_dedup_key(item.title))
+    
+    # Classed containers, only when DOM similarity found too few items
+    if len(dom_items) < EnhancedHTMLParser.MIN_DOM_ITEMS:
+        containers = tree.css('div[class], article[class], li[class], section[class]')
+        for container in containers[:EnhancedHTMLParser.MAX_CONTAINERS]:
+            title_tag = _fast_find(container, ', '.join(HEADING_TAGS))
+            if title_tag is None:
+                title_tag = _fast_find(container, 'a[href]') or _fast_find(container, 'strong')
+            if title_tag is None:
+                continue
+            
+            title_text = _WS_RE.sub(' ', _fast_text(title_tag, text_cache))
+            title_key = _dedup_key(title_text)
+            if title_key in seen_texts or len(title_text) < 3:
+                continue
+            if title_text.lower() in _CONTAINER_NAV_TITLES:
+                continue
+            seen_texts.add(title_key)
+            
+            link_tag = _fast_find(container, 'a[href]')
+            link_url = urljoin(base_url, link_tag.attributes.get('href') or '') if link_tag is not None else None
+            
+            metadata = {}
+            for span in _fast_find_all(container, 'span[class], div[class], p[class]'):
+                numeric_match = _NUM_RE.search(_fast_text(span, text_cache))
+                if numeric_match:
+                    class_name = ' '.join(_fast_classes(span))
+                    metadata[f'numeric_{class_name[:30]}'] = numeric_match.group()
+            
+            items.append(Item(
+                title=title_text,
+                link=link_url,
+                context=_fast_text(container, text_cache, ' ')[:500],
+                metadata=metadata,
+                container_type=container.tag
+            ))
+    
+    # Table rows
+    for table in tree.css('table'):
+        for row in islice(_fast_table_rows(table), 1, None):
+            cells = _fast_row_cells(row)
+            if not cells:
+                continue
+            first_cell_text = _fast_text(cells[0], text_cache)
+            cell_key = _dedup_key(first_cell_text)
+            if len(first_cell_text) > 2 and cell_key not in seen_texts:
+                seen_texts.add(cell_key)
+                link_tag = _fast_find(cells[0], 'a[href]')
+                cell_data = [_fast_text(cell, text_cache) for cell in cells]
+                items.append(Item(
+                    title=first_cell_text,
+                    link=urljoin(base_url, link_tag.attributes.get('href') or '') if link_tag is not None else None,
+                    context=' | '.join(cell_data),
+                    metadata={'table_data': cell_data},
+                    container_type='table_row'
+                ))
+    
+    return items
+
+
+def _parse_worker(page: Tuple[str, str]) -> Dict:
+    """Process-pool entry point for EnhancedHTMLParser.parse_many."""
+    html_content, base_url = page
+    return EnhancedHTMLParser.parse(html_content, base_url)
@@ -4,11 +4,212 @@ Uses DOM similarity, semantic analysis, intelligent scoring
 """
 from bs4 import BeautifulSoup, Tag, NavigableString
 from urllib.parse import urljoin, urlparse
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from loguru import logger
 import re
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.utils.html_parser import (
+    SELECTOLAX_AVAILABLE, _fast_find, _fast_find_all, _fast_text, _fast_classes
+)
+
+if SELECTOLAX_AVAILABLE:
+    from selectolax.lexbor import LexborHTMLParser
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# C tree builder when available; the pure-Python parser otherwise
+SOUP_FEATURES = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+# Noise removed before any extraction
+_NOISE_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript']
+
+# Patterns used in the per-element loops, compiled once. Numbers are ASCII
+# digits; whitespace stays Unicode-aware so NBSP and friends still collapse.
+_WS_RE = re.compile(r'\s+')
+_NUM_RE = re.compile(r'[0-9,]+\.?[0-9]*', re.ASCII)
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Classed tags scanned for numeric/price/rating metadata
+_META_TAGS = frozenset({'span', 'div', 'p'})
+# Currency symbols and rating words in metadata text; ASCII case folding
+# matches what text.lower() did for these ASCII keywords
+_PRICE_RE = re.compile(r'[$€₹£¥]')
+_RATING_RE = re.compile(r'star|rating|/5|review', re.IGNORECASE | re.ASCII)
+
+# Link scoring: detail-page and navigation URL parts (case-insensitive, so
+# the URL is never lowercased), and link texts that say nothing
+_DETAIL_URL_RE = re.compile(r'/(?:details|view|profile|article|product)/', re.IGNORECASE | re.ASCII)
+_NAV_URL_RE = re.compile(r'/(?:login|signup|cart|checkout|privacy|terms)', re.IGNORECASE | re.ASCII)
+_GENERIC_LINK_TEXT = frozenset({'click here', 'read more', 'learn more', 'next', 'previous'})
+
+
+def _html_digest(html_content: str) -> str:
+    """Fast fingerprint of a page for the persistent parse cache."""
+    data = html_content.encode('utf-8', 'surrogatepass')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class _ParseStore:
+    """
+    sqlite-backed memo of parse() results keyed by (page digest, base_url),
+    so re-crawls of an unchanged page and restarts skip the full parse.
+    The store does blocking file I/O; async callers run parse() in a thread.
+    Expired rows are purged and the row count capped every PURGE_INTERVAL
+    seconds while the store is being written.
+    """
+    
+    PURGE_INTERVAL = 300  # seconds
+    
+    def __init__(self, persistence_file: Optional[str], ttl: float, max_rows: int):
+        self.persistence_file = persistence_file
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._next_purge = 0.0
+    
+    def _after_fork(self):
+        """A forked parse_many worker must not reuse the parent's connection or lock."""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._db = None
+            self._lock = threading.Lock()
+    
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        """
+        Open the store on first use, dropping expired rows. A location that
+        cannot be created or written leaves the store off.
+        """
+        if self._db is None and self.persistence_file:
+            try:
+                directory = os.path.dirname(self.persistence_file) or "."
+                os.makedirs(directory, exist_ok=True)
+                if not os.access(directory, os.W_OK):
+                    raise PermissionError(f"{directory} is not writable")
+                self._db = sqlite3.connect(self.persistence_file, check_same_thread=False)
+                # WAL with NORMAL sync: a commit appends to the log without an fsync
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS parses "
+                    "(digest TEXT NOT NULL, base_url TEXT NOT NULL, expires REAL NOT NULL, "
+                    "result BLOB NOT NULL, PRIMARY KEY (digest, base_url))"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS parses_expires ON parses (expires)")
+                self._purge(self._db)
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"[Parser] Persistent parse cache disabled: {e}")
+                self._db = None
+                self.persistence_file = None
+        return self._db
+    
+    def _purge(self, db: sqlite3.Connection):
+        """Drop expired rows, then the soonest-expiring ones beyond max_rows."""
+        now = time.time()
+        db.execute("DELETE FROM parses WHERE expires <= ?", (now,))
+        excess = db.execute("SELECT COUNT(*) FROM parses").fetchone()[0] - self.max_rows
+        if excess > 0:
+            db.execute(
+                "DELETE FROM parses WHERE rowid IN "
+                "(SELECT rowid FROM parses ORDER BY expires LIMIT ?)",
+                (excess,)
+            )
+        self._next_purge = now + self.PURGE_INTERVAL
+    
+    def load(self, digest: str, base_url: str) -> Optional[Dict]:
+        self._after_fork()
+        with self._lock:
+            db = self._get_db()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT expires, result FROM parses WHERE digest = ? AND base_url = ?",
+                    (digest, base_url)
+                ).fetchone()
+            except Exception as e:
+                logger.debug(f"[Parser] Could not read cached parse: {e}")
+                return None
+        if row is None or row[0] <= time.time():
+            return None
+        return orjson.loads(row[1]) if ORJSON_AVAILABLE else json.loads(row[1])
+    
+    def save(self, digest: str, base_url: str, result: Dict):
+        try:
+            data = orjson.dumps(result) if ORJSON_AVAILABLE else json.dumps(result)
+        except Exception as e:
+            logger.debug(f"[Parser] Could not serialize parse result: {e}")
+            return
+        self._after_fork()
+        with self._lock:
+            db = self._get_db()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO parses (digest, base_url, expires, result) VALUES (?, ?, ?, ?)",
+                    (digest, base_url, time.time() + self.ttl, data)
+                )
+                if time.time() >= self._next_purge:
+                    self._purge(db)
+                db.commit()
+            except Exception as e:
+                logger.debug(f"[Parser] Could not persist parse result: {e}")
+
+
+def _format_signature(signature: Tuple) -> str:
+    """Readable form of a structure signature, for logs."""
+    return '_'.join(part if isinstance(part, str) else f"{part[0]}x{part[1]}" for part in signature)
+
+
+def _repeated_signatures(signed: List[Tuple], min_count: int, limit: int) -> Dict:
+    """
+    signature -> (occurrences, first `limit` elements), in first-seen order,
+    for signatures seen at least min_count times. Counting first means the
+    one-off signatures most elements have never get a list of their own.
+    """
+    counts = Counter(sig for sig, _ in signed)
+    buckets = {}
+    for sig, element in signed:
+        count = counts[sig]
+        if count < min_count:
+            continue
+        bucket = buckets.get(sig)
+        if bucket is None:
+            bucket = buckets[sig] = (count, [])
+        if len(bucket[1]) < limit:
+            bucket[1].append(element)
+    return buckets
 
 
 class AdvancedHTMLParser:
@@ -21,24 +222,55 @@ class AdvancedHTMLParser:
     5. Context-aware extraction
     """
     
+    # Runtime cache data lives outside the source tree (backend/data is git-ignored).
+    # PARSE_CACHE_FILE overrides the location; an empty value turns the store off.
+    PARSE_CACHE_FILE = os.getenv(
+        "PARSE_CACHE_FILE",
+        str(Path(__file__).resolve().parents[2] / "data" / "cache" / "parse_cache.db")
+    ) or None
+    PARSE_CACHE_TTL = 24 * 3600  # 1 day
+    PARSE_CACHE_MAX_ROWS = 2000
+    # Only parses slower than this are persisted; cheap ones are not worth a write
+    MIN_CACHED_PARSE_SECONDS = 0.05
+    
     @staticmethod
-    def parse(html_content: str, base_url: str) -> Dict:
+    def parse(html_content: str, base_url: str, use_cache: bool = True) -> Dict:
         """Main parsing entry point with advanced algorithms"""
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            if use_cache:
+                digest = _html_digest(html_content)
+                cached = _PARSE_STORE.load(digest, base_url)
+                if cached is not None:
+                    return cached
+            started = time.perf_counter()
+            
+            soup = BeautifulSoup(html_content, SOUP_FEATURES)
             
             # Clean noise
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'iframe', 'noscript']):
+            for element in soup(_NOISE_TAGS):
                 element.decompose()
             
+            # The two traversal-heavy algorithms run on selectolax's C tree when available
+            tree = None
+            if SELECTOLAX_AVAILABLE:
+                tree = LexborHTMLParser(html_content)
+                tree.strip_tags(_NOISE_TAGS)
+                text_cache = {}
+            
             # ALGORITHM 1: DOM Similarity Analysis (finds data structures)
-            structured_items = AdvancedHTMLParser._dom_similarity_extraction(soup, base_url)
+            if tree is not None:
+                structured_items = _fast_dom_similarity(tree, base_url, text_cache)
+            else:
+                structured_items = AdvancedHTMLParser._dom_similarity_extraction(soup, base_url)
             
             # ALGORITHM 2: Semantic extraction (understands content)
             semantic_data = AdvancedHTMLParser._semantic_extraction(soup)
             
             # ALGORITHM 3: Intelligent link extraction
-            links = AdvancedHTMLParser._smart_link_extraction(soup, base_url)
+            if tree is not None:
+                links = _fast_smart_links(tree, base_url, text_cache)
+            else:
+                links = AdvancedHTMLParser._smart_link_extraction(soup, base_url)
             
             # ALGORITHM 4: Metadata
             metadata = AdvancedHTMLParser._extract_metadata(soup)
@@ -48,17 +280,35 @@ class AdvancedHTMLParser:
             
             logger.info(f"✓ Extracted: {len(structured_items)} items, {len(links)} links, {len(semantic_data)} semantic blocks")
             
-            return {
+            result = {
                 "text_content": text_content,
                 "links": links,
                 "structured_data": semantic_data,
                 "metadata": metadata,
                 "structured_items": structured_items
             }
+            if use_cache and time.perf_counter() - started >= AdvancedHTMLParser.MIN_CACHED_PARSE_SECONDS:
+                _PARSE_STORE.save(digest, base_url, result)
+            return result
         except Exception as e:
             logger.error(f"Parsing error: {e}")
             return {"text_content": "", "links": [], "structured_data": {}, "metadata": {}, "structured_items": []}
     
+    @staticmethod
+    def parse_many(pages: Iterable[Tuple[str, str]], max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Parse many (html_content, base_url) pages across worker processes.
+        Results keep the input order.
+        """
+        pages = list(pages)
+        workers = min(max_workers or os.cpu_count() or 1, len(pages))
+        
+        if workers <= 1:
+            return [AdvancedHTMLParser.parse(html_content, base_url) for html_content, base_url in pages]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_parse_worker, pages, chunksize=8))
+    
     @staticmethod
     def _dom_similarity_extraction(soup: BeautifulSoup, base_url: str) -> List[Dict]:
         """
@@ -70,10 +320,8 @@ class AdvancedHTMLParser:
         items = []
         seen_hashes = set()
         
-        # Build signature map: signature -> [elements with that signature]
-        signature_map = defaultdict(list)
-        
-        # Analyze all container elements
+        # Analyze all container elements: structural signature per element
+        signed = []
         for element in soup.find_all(['div', 'article', 'li', 'section', 'tr']):
             if not isinstance(element, Tag):
                 continue
@@ -81,23 +329,23 @@ class AdvancedHTMLParser:
             # Generate structural signature
             sig = AdvancedHTMLParser._compute_structure_signature(element)
             if sig:
-                signature_map[sig].append(element)
+                signed.append((sig, element))
+        
+        # Find repeating patterns (3+ occurrences = likely data structure);
+        # only those get an element bucket
+        signature_map = _repeated_signatures(signed, 3, 150)
         
-        # Find repeating patterns (3+ occurrences = likely data structure)
         pattern_count = 0
-        for signature, elements in signature_map.items():
-            if len(elements) < 3:
-                continue
-            
+        for signature, (count, elements) in signature_map.items():
             pattern_count += 1
-            logger.debug(f"Pattern {pattern_count}: {len(elements)} elements with signature '{signature[:40]}...'")
+            logger.debug(f"Pattern {pattern_count}: {count} elements with signature '{_format_signature(signature)[:40]}...'")
             
             # Extract data from each repeated element
-            for elem in elements[:150]:  # Limit per pattern
+            for elem in elements:  # Limit per pattern
                 item = AdvancedHTMLParser._extract_from_element(elem, base_url)
                 if item:
-                    # Deduplicate by content hash
-                    content_hash = hashlib.md5(item['title'].encode()).hexdigest()[:16]
+                    # Deduplicate by content hash (local set, no need for a digest)
+                    content_hash = hash(item['title'])
                     if content_hash not in seen_hashes:
                         seen_hashes.add(content_hash)
                         items.append(item)
@@ -106,7 +354,7 @@ class AdvancedHTMLParser:
         return items
     
     @staticmethod
-    def _compute_structure_signature(element: Tag) -> str:
+    def _compute_structure_signature(element: Tag) -> Tuple:
         """
         Compute structural signature of element.
         
@@ -115,6 +363,9 @@ class AdvancedHTMLParser:
         - Top 3 class names (sorted)
         - Child element types and counts
         - Attribute patterns
+        
+        Returned as a tuple: it is only hashed and compared, never displayed
+        (log lines format it on demand).
         """
         try:
             parts = [element.name]
@@ -128,18 +379,31 @@ class AdvancedHTMLParser:
             children = [c.name for c in element.children if isinstance(c, Tag)]
             if children:
                 child_counts = Counter(children)
-                for tag, count in child_counts.most_common(4):
-                    parts.append(f"{tag}x{count}")
-            
-            # Attribute patterns (has href, has src, etc.)
-            if element.find('a', href=True):
+                parts.extend(child_counts.most_common(4))
+            
+            # Attribute patterns (has href, has src, etc.): one descendants
+            # walk that stops once both are seen, instead of two find() calls
+            has_link = has_img = False
+            for node in element.descendants:
+                name = node.name  # None for strings and comments
+                if name == 'a':
+                    if not has_link and 'href' in node.attrs:
+                        has_link = True
+                        if has_img:
+                            break
+                elif name == 'img':
+                    if not has_img and 'src' in node.attrs:
+                        has_img = True
+                        if has_link:
+                            break
+            if has_link:
                 parts.append('has_link')
-            if element.find('img', src=True):
+            if has_img:
                 parts.append('has_img')
             
-            return '_'.join(parts)
+            return tuple(parts)
         except:
-            return ""
+            return ()
     
     @staticmethod
     def _extract_from_element(element: Tag, base_url: str) -> Dict:
@@ -157,7 +421,7 @@ class AdvancedHTMLParser:
                 return None
             
             # Clean title
-            title = re.sub(r'\s+', ' ', title).strip()
+            title = _WS_RE.sub(' ', title).strip()
             
             # Filter noise
             if title.lower() in ['home', 'login', 'signup', 'menu', 'search', 'more', 'next', 'prev', 'loading']:
@@ -173,27 +437,31 @@ class AdvancedHTMLParser:
             
             # STEP 3: Extract metadata (ratings, prices, counts)
             metadata = {}
-            for tag in element.find_all(['span', 'div', 'p'], class_=True):
+            for tag in element.descendants:
+                # Same set as find_all(['span', 'div', 'p'], class_=True),
+                # without bs4's per-node matcher
+                if not isinstance(tag, Tag) or tag.name not in _META_TAGS or 'class' not in tag.attrs:
+                    continue
                 text = tag.get_text(strip=True)
                 
                 # Extract numeric values
-                numbers = re.findall(r'[\d,]+\.?\d*', text)
-                if numbers:
+                number = _NUM_RE.search(text)
+                if number:
                     key = '_'.join(tag.get('class', []))[:40]
                     if key:
-                        metadata[key] = numbers[0]
+                        metadata[key] = number.group()
                 
                 # Detect currencies
-                if any(sym in text for sym in ['$', '€', '₹', '£', '¥']):
+                if _PRICE_RE.search(text):
                     metadata['price'] = text
                 
                 # Detect ratings
-                if any(word in text.lower() for word in ['star', 'rating', '/5', 'review']):
+                if _RATING_RE.search(text):
                     metadata['rating'] = text
             
             # STEP 4: Get context (full text)
             context = element.get_text(separator=' ', strip=True)
-            context = re.sub(r'\s+', ' ', context)[:500]
+            context = _WS_RE.sub(' ', context)[:500]
             
             return {
                 'title': title,
@@ -285,46 +553,49 @@ class AdvancedHTMLParser:
             if a_tag.parent:
                 parent_text = a_tag.parent.get_text(strip=True)[:150]
             
-            # CALCULATE RELEVANCE SCORE
-            score = 0
-            
-            # Text length bonus
-            if 10 < len(link_text) < 100:
-                score += 5
-            elif len(link_text) > 100:
-                score += 2
-            
-            # Title attribute bonus
-            if title:
-                score += 3
-            
-            # URL pattern analysis
-            url_lower = url.lower()
-            if any(pattern in url_lower for pattern in ['/details/', '/view/', '/profile/', '/article/', '/product/']):
-                score += 10
-            
-            # Penalize navigation
-            if any(pattern in url_lower for pattern in ['/login', '/signup', '/cart', '/checkout', '/privacy', '/terms']):
-                score -= 10
-            
-            # Penalize generic text
-            if link_text.lower() in ['click here', 'read more', 'learn more', 'next', 'previous']:
-                score -= 5
-            
-            links.append({
-                'url': url,
-                'text': link_text,
-                'title': title,
-                'context': parent_text,
-                'relevance_score': score,
-                'domain': urlparse(url).netloc
-            })
+            links.append(AdvancedHTMLParser._score_link(url, link_text, title, parent_text))
         
         # Sort by relevance
         links.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
         
         return links
     
+    @staticmethod
+    def _score_link(url: str, link_text: str, title: str, parent_text: str) -> Dict:
+        """Build a link record with its relevance score"""
+        score = 0
+        
+        # Text length bonus
+        if 10 < len(link_text) < 100:
+            score += 5
+        elif len(link_text) > 100:
+            score += 2
+        
+        # Title attribute bonus
+        if title:
+            score += 3
+        
+        # URL pattern analysis
+        if _DETAIL_URL_RE.search(url):
+            score += 10
+        
+        # Penalize navigation
+        if _NAV_URL_RE.search(url):
+            score -= 10
+        
+        # Penalize generic text
+        if link_text.lower() in _GENERIC_LINK_TEXT:
+            score -= 5
+        
+        return {
+            'url': url,
+            'text': link_text,
+            'title': title,
+            'context': parent_text,
+            'relevance_score': score,
+            'domain': urlparse(url).netloc
+        }
+    
     @staticmethod
     def _extract_metadata(soup: BeautifulSoup) -> Dict:
         """Extract page metadata"""
@@ -351,8 +622,156 @@ class AdvancedHTMLParser:
     @staticmethod
     def _get_structured_text(soup: BeautifulSoup) -> str:
         """Get clean text with preserved structure"""
-        # Get text with preserved newlines
-        text = soup.get_text(separator='\n', strip=True)
-        # Collapse multiple newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        return text
+        # One line per stripped string, written straight into a buffer. The
+        # pieces are stripped, so runs of 3+ newlines can only sit inside a
+        # piece; those few are collapsed in place instead of re-scanning the
+        # whole document afterwards.
+        buffer = io.StringIO()
+        first = True
+        for piece in soup.stripped_strings:
+            if not first:
+                buffer.write('\n')
+            first = False
+            if '\n\n\n' in piece:
+                piece = _BLANK_LINES_RE.sub('\n\n', piece)
+            buffer.write(piece)
+        return buffer.getvalue()
+
+
+_PARSE_STORE = _ParseStore(
+    AdvancedHTMLParser.PARSE_CACHE_FILE,
+    AdvancedHTMLParser.PARSE_CACHE_TTL,
+    AdvancedHTMLParser.PARSE_CACHE_MAX_ROWS
+)
+
+
+# selectolax (Lexbor) versions of the traversal-heavy algorithms. They return
+# the same shapes as their BeautifulSoup counterparts above.
+
+def _fast_structure_signature(node) -> Tuple:
+    parts = [node.tag]
+    
+    classes = _fast_classes(node)
+    if classes:
+        parts.extend(sorted(classes)[:3])
+    
+    children = [child.tag for child in node.iter() if child.is_element_node]
+    if children:
+        parts.extend(Counter(children).most_common(4))
+    
+    if _fast_find(node, 'a[href]') is not None:
+        parts.append('has_link')
+    if _fast_find(node, 'img[src]') is not None:
+        parts.append('has_img')
+    
+    return tuple(parts)
+
+def _fast_extract_from_element(node, base_url: str, text_cache: Dict) -> Dict:
+    title = None
+    for selector in ('h1, h2, h3, h4, h5, h6', 'a', 'strong', 'span'):
+        tag = _fast_find(node, selector)
+        if tag is not None:
+            title = _fast_text(tag, text_cache)
+            break
+    
+    if not title or len(title) < 3 or len(title) > 200:
+        return None
+    
+    title = _WS_RE.sub(' ', title).strip()
+    
+    if title.lower() in ['home', 'login', 'signup', 'menu', 'search', 'more', 'next', 'prev', 'loading']:
+        return None
+    
+    link = None
+    link_tag = _fast_find(node, 'a[href]')
+    if link_tag is not None:
+        href = link_tag.attributes.get('href') or ''
+        if not href.startswith(('javascript:', '#', 'mailto:')):
+            link = urljoin(base_url, href)
+    
+    metadata = {}
+    for tag in _fast_find_all(node, 'span[class], div[class], p[class]'):
+        text = _fast_text(tag, text_cache)
+        
+        number = _NUM_RE.search(text)
+        if number:
+            key = '_'.join(_fast_classes(tag))[:40]
+            if key:
+                metadata[key] = number.group()
+        
+        if _PRICE_RE.search(text):
+            metadata['price'] = text
+        
+        if _RATING_RE.search(text):
+            metadata['rating'] = text
+    
+    context = _fast_text(node, text_cache, ' ')
+    context = _WS_RE.sub(' ', context)[:500]
+    
+    return {
+        'title': title,
+        'link': link,
+        'context': context,
+        'metadata': metadata,
+        'extraction_method': 'dom_similarity'
+    }
+
+def _fast_dom_similarity(tree, base_url: str, text_cache: Dict) -> List[Dict]:
+    items = []
+    seen_hashes = set()
+    
+    signed = [(_fast_structure_signature(node), node) for node in tree.css('div, article, li, section, tr')]
+    signature_map = _repeated_signatures(signed, 3, 150)
+    
+    pattern_count = 0
+    for signature, (count, nodes) in signature_map.items():
+        pattern_count += 1
+        logger.debug(f"Pattern {pattern_count}: {count} elements with signature '{_format_signature(signature)[:40]}...'")
+        
+        for node in nodes:
+            try:
+                item = _fast_extract_from_element(node, base_url, text_cache)
+            except Exception:
+                item = None
+            if item:
+                content_hash = hash(item['title'])
+                if content_hash not in seen_hashes:
+                    seen_hashes.add(content_hash)
+                    items.append(item)
+    
+    logger.info(f"DOM similarity found {len(items)} unique items from {pattern_count} patterns")
+    return items
+
+def _fast_smart_links(tree, base_url: str, text_cache: Dict) -> List[Dict]:
+    links = []
+    seen_urls = set()
+    
+    for a_tag in tree.css('a[href]'):
+        attrs = a_tag.attributes
+        href = (attrs.get('href') or '').strip()
+        
+        if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            continue
+        
+        url = urljoin(base_url, href)
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+        
+        link_text = _fast_text(a_tag, text_cache)
+        title = attrs.get('title') or ''
+        
+        parent = a_tag.parent
+        parent_text = _fast_text(parent, text_cache)[:150] if parent is not None else ''
+        
+        links.append(AdvancedHTMLParser._score_link(url, link_text, title, parent_text))
+    
+    links.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+    
+    return links
+
+
+def _parse_worker(page: Tuple[str, str]) -> Dict:
+    """Process-pool entry point for AdvancedHTMLParser.parse_many."""
+    html_content, base_url = page
+    return AdvancedHTMLParser.parse(html_content, base_url)
@@ -7,6 +7,69 @@ from typing import List, Dict
 from loguru import logger
 import re
 from collections import Counter
+import functools
+import numpy as np
+
+from app.utils.matching import count_terms
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Per-entity ranking signals, one row per entity
+_SIGNAL_DTYPE = np.dtype([
+    ('title_overlap', np.int64),
+    ('context_freq', np.int64),
+    ('completeness', np.int64),
+    ('title_length', np.int64),
+    ('link_quality', np.int64),
+    ('metadata_count', np.int64),
+])
+
+# Below this many query terms, one str.count per term beats an automaton sweep
+_AC_MIN_TERMS = 16
+
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at',
+    'to', 'for', 'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were'
+})
+
+# Patterns used per entity, compiled once. Word and whitespace classes stay
+# Unicode-aware because titles and queries are not English-only; URLs are
+# matched with ASCII semantics.
+_WORD_RE = re.compile(r'\w+')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WS_RE = re.compile(r'\s+')
+# Junk titles in one scan: a long non-ASCII run, or a whole-word spam phrase.
+# Case folding is scoped to the phrases so it cannot leak into the byte range.
+_JUNK_TITLE_RE = re.compile(
+    r'[^\x00-\x7F]{10,}'
+    r'|(?i:\b(?:click here|subscribe now|buy now|advertisement|ad)\b)'
+)
+# All pagination markers in one scan; when a URL carries several kinds,
+# the earliest kind in _PAGINATION_PRIORITY wins
+_PAGINATION_RE = re.compile(r'(?P<key>page|p|offset|start)=(?P<num>[0-9]+)|/page/(?P<seg>[0-9]+)')
+_PAGINATION_PRIORITY = {'page': 0, 'p': 1, '/page/': 2, 'offset': 3, 'start': 4}
+
+
+@functools.lru_cache(maxsize=256)
+def _query_terms(query: str) -> frozenset:
+    """Lowercased query words minus stop words."""
+    return frozenset(_WORD_RE.findall(query.lower())) - _STOP_WORDS
+
+
+@functools.lru_cache(maxsize=64)
+def _query_automaton(query_terms: frozenset):
+    """Automaton over the query terms for long queries, else None."""
+    if not AHOCORASICK_AVAILABLE or len(query_terms) < _AC_MIN_TERMS:
+        return None
+    automaton = ahocorasick.Automaton()
+    for term in query_terms:
+        automaton.add_word(term, term)
+    automaton.make_automaton()
+    return automaton
 
 
 class IntelligentRanker:
@@ -30,96 +93,85 @@ class IntelligentRanker:
         if not entities or not query:
             return entities
         
-        # Extract query terms
-        query_terms = set(re.findall(r'\w+', query.lower()))
-        # Remove stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 
-            'to', 'for', 'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were'
-        }
-        query_terms = query_terms - stop_words
+        # Extract query terms (stop words removed); both are memoized per
+        # query since paginated batches rank against the same one
+        query_terms = _query_terms(query)
+        automaton = _query_automaton(query_terms)
         
-        scored_entities = []
+        # Pass 1: per-entity signals that need string work, one row per entity
+        signals = np.zeros(len(entities), dtype=_SIGNAL_DTYPE)
         
-        for entity in entities:
-            score = 0
-            signals = {}
-            
-            title = str(entity.get('title', '')).lower()
-            context = str(entity.get('context', '')).lower()
+        for idx, entity in enumerate(entities):
+            # Look each field up once; everything below reuses these
+            title_raw = entity.get('title', '')
+            context_raw = entity.get('context', '')
+            link = entity.get('link', '')
+            metadata = entity.get('metadata', {})
+            title = str(title_raw).lower()
+            context = str(context_raw).lower()
             
             # SIGNAL 1: Query term overlap in title (most important)
-            title_words = set(re.findall(r'\w+', title))
+            title_words = set(_WORD_RE.findall(title))
             title_overlap = len(query_terms & title_words)
-            score += title_overlap * 20  # High weight
-            signals['title_overlap'] = title_overlap
             
             # SIGNAL 2: Query term frequency in context
-            context_freq = sum(context.count(term) for term in query_terms)
-            score += min(context_freq * 5, 30)  # Cap at 30 points
-            signals['context_freq'] = context_freq
+            if automaton is not None:
+                context_freq = count_terms(automaton, context)
+            else:
+                context_freq = sum(context.count(term) for term in query_terms)
             
             # SIGNAL 3: Entity completeness
             completeness = 0
-            if entity.get('link'):
+            if link:
                 completeness += 1
-            if entity.get('metadata') and len(entity['metadata']) > 0:
+            if metadata and len(metadata) > 0:
                 completeness += 1
-            if entity.get('context') and len(entity['context']) > 50:
+            if context_raw and len(context_raw) > 50:
                 completeness += 1
             
-            score += completeness * 10
-            signals['completeness'] = completeness
-            
-            # SIGNAL 4: Title quality
-            title_length = len(entity.get('title', ''))
-            if 20 <= title_length <= 150:  # Good length
-                score += 5
-                signals['title_quality'] = 5
-            elif title_length < 10:  # Too short
-                score -= 5
-                signals['title_quality'] = -5
-            
-            # SIGNAL 5: Position bias (earlier in source = more relevant)
-            # Assume entities are in document order
-            position_score = max(0, 10 - (entities.index(entity) // 10))
-            score += position_score
-            signals['position'] = position_score
+            # SIGNAL 4 input: title length
+            title_length = len(title_raw)
             
             # SIGNAL 6: Link quality
-            link = entity.get('link', '')
+            link_quality = 0
             if link:
+                link_lower = link.lower()
                 # Prefer detail pages over list pages
-                if any(keyword in link.lower() for keyword in ['detail', 'view', 'profile', 'show']):
-                    score += 8
-                    signals['link_quality'] = 8
+                if any(keyword in link_lower for keyword in ['detail', 'view', 'profile', 'show']):
+                    link_quality = 8
                 # Penalize navigation links
-                elif any(keyword in link.lower() for keyword in ['login', 'search', 'category', 'tag']):
-                    score -= 5
-                    signals['link_quality'] = -5
+                elif any(keyword in link_lower for keyword in ['login', 'search', 'category', 'tag']):
+                    link_quality = -5
             
-            # SIGNAL 7: Metadata richness
-            metadata = entity.get('metadata', {})
+            # SIGNAL 7 input: metadata richness
             metadata_count = len(metadata)
-            score += min(metadata_count * 2, 10)  # Cap at 10 points
-            signals['metadata_richness'] = metadata_count
             
-            scored_entities.append({
-                'entity': entity,
-                'score': score,
-                'signals': signals
-            })
+            signals[idx] = (title_overlap, context_freq, completeness, title_length, link_quality, metadata_count)
         
-        # Sort by score descending
-        scored_entities.sort(key=lambda x: x['score'], reverse=True)
+        # Pass 2: combine all signals as whole-column arithmetic
+        title_length = signals['title_length']
+        score = (
+            signals['title_overlap'] * 20  # High weight
+            + np.minimum(signals['context_freq'] * 5, 30)  # Cap at 30 points
+            + signals['completeness'] * 10
+            # SIGNAL 4: Title quality (good length vs too short)
+            + np.where((title_length >= 20) & (title_length <= 150), 5, np.where(title_length < 10, -5, 0))
+            # SIGNAL 5: Position bias (earlier in source = more relevant);
+            # assume entities are in document order
+            + np.maximum(0, 10 - np.arange(len(entities)) // 10)
+            + signals['link_quality']
+            + np.minimum(signals['metadata_count'] * 2, 10)  # Cap at 10 points
+        )
+        
+        # Sort by score descending; stable, so ties keep document order
+        order = np.argsort(-score, kind='stable')
         
         # Log top scores for debugging
-        if scored_entities:
-            top_scores = [f"{s['score']:.0f}" for s in scored_entities[:5]]
-            logger.info(f"Top 5 scores: {', '.join(top_scores)}")
+        top_scores = [f"{score[i]:.0f}" for i in order[:5]]
+        logger.info(f"Top 5 scores: {', '.join(top_scores)}")
         
         # Return ranked entities
-        return [item['entity'] for item in scored_entities]
+        return [entities[i] for i in order.tolist()]
     
     @staticmethod
     def deduplicate_smart(entities: List[Dict], similarity_threshold: float = 0.8) -> List[Dict]:
@@ -131,7 +183,11 @@ class IntelligentRanker:
             return []
         
         unique_entities = []
-        seen_signatures = []
+        # word -> ids of kept signatures containing it. Only signatures that
+        # share a word can reach a positive Jaccard score, so each title is
+        # compared against those instead of against every kept signature.
+        postings = {}
+        kept_sizes = []
         
         for entity in entities:
             title = str(entity.get('title', '')).lower().strip()
@@ -141,21 +197,34 @@ class IntelligentRanker:
             
             # Create signature (normalized title)
             # Remove special chars, extra spaces
-            signature = re.sub(r'[^\w\s]', '', title)
-            signature = re.sub(r'\s+', ' ', signature).strip()
+            signature = _PUNCT_RE.sub('', title)
+            signature = _WS_RE.sub(' ', signature).strip()
+            words = set(signature.split())
             
-            # Check similarity with existing signatures
+            # Check similarity with existing signatures (word-level Jaccard,
+            # as in _calculate_similarity)
             is_duplicate = False
-            for existing_sig in seen_signatures:
-                similarity = IntelligentRanker._calculate_similarity(signature, existing_sig)
+            if similarity_threshold <= 0:
+                # Every pair scores >= 0: only the first title survives
+                is_duplicate = bool(unique_entities)
+            elif words:
+                shared = Counter()
+                for word in words:
+                    for kept_id in postings.get(word, ()):
+                        shared[kept_id] += 1
                 
-                if similarity >= similarity_threshold:
-                    is_duplicate = True
-                    break
+                size = len(words)
+                for kept_id, common in shared.items():
+                    if common / (size + kept_sizes[kept_id] - common) >= similarity_threshold:
+                        is_duplicate = True
+                        break
             
             if not is_duplicate:
+                kept_id = len(kept_sizes)
+                for word in words:
+                    postings.setdefault(word, []).append(kept_id)
+                kept_sizes.append(len(words))
                 unique_entities.append(entity)
-                seen_signatures.append(signature)
         
         logger.info(f"Deduplication: {len(entities)} -> {len(unique_entities)} unique items")
         return unique_entities
@@ -184,8 +253,6 @@ class IntelligentRanker:
         Filter entities by minimum quality threshold
         POWER: Remove noise before processing
         """
-        from app.utils.quality_analyzer import DataQualityAnalyzer
-        
         filtered = []
         
         for entity in entities:
@@ -196,13 +263,8 @@ class IntelligentRanker:
             if not title or len(title) < 3:
                 continue
             
-            # Check for garbage patterns
-            if re.search(r'[^\x00-\x7F]{10,}', title):  # Too much non-ASCII
-                continue
-            
-            # Check for spam keywords
-            spam_keywords = ['click here', 'subscribe now', 'buy now', 'ad', 'advertisement']
-            if any(keyword in title.lower() for keyword in spam_keywords):
+            # Check for garbage patterns (too much non-ASCII) and spam keywords
+            if _JUNK_TITLE_RE.search(title):
                 continue
             
             filtered.append(entity)
@@ -220,20 +282,11 @@ class IntelligentRanker:
         Returns next page URL if available
         """
         # Look for pagination indicators in URLs
-        pagination_patterns = [
-            r'page=(\d+)',
-            r'p=(\d+)',
-            r'/page/(\d+)',
-            r'offset=(\d+)',
-            r'start=(\d+)'
-        ]
-        
+        markers = [(m.group('key') or '/page/', m) for m in _PAGINATION_RE.finditer(url)]
+        kind = min((k for k, _ in markers), key=_PAGINATION_PRIORITY.__getitem__, default=None)
         current_page = 1
-        for pattern in pagination_patterns:
-            match = re.search(pattern, url)
-            if match:
-                current_page = int(match.group(1))
-                break
+        if kind is not None:
+            current_page = int(next(m.group('num') or m.group('seg') for k, m in markers if k == kind))
         
         # Look for "next page" links in entities
         next_page_url = None
@@ -246,15 +299,18 @@ class IntelligentRanker:
                 break
         
         # If no explicit next link, construct one
-        if not next_page_url and current_page:
-            for pattern in pagination_patterns:
-                if re.search(pattern, url):
-                    next_page_url = re.sub(
-                        pattern,
-                        lambda m: f"{m.group(0).split('=')[0] if '=' in m.group(0) else '/page/'}={current_page + 1}",
-                        url
-                    )
-                    break
+        if not next_page_url and current_page and kind is not None:
+            # Rewrite every marker of the winning kind from the same scan
+            replacement = f"/page/{current_page + 1}" if kind == '/page/' else f"{kind}={current_page + 1}"
+            parts = []
+            pos = 0
+            for k, m in markers:
+                if k == kind:
+                    parts.append(url[pos:m.start()])
+                    parts.append(replacement)
+                    pos = m.end()
+            parts.append(url[pos:])
+            next_page_url = ''.join(parts)
         
         return {
             'has_pagination': bool(next_page_url),
@@ -0,0 +1,20 @@
+"""
+Multi-term matching helpers shared by the ranking and context utilities
+"""
+
+
+def count_terms(automaton, text: str) -> int:
+    """
+    sum(text.count(term) for term in the automaton's terms) in one sweep.
+    
+    The automaton must map each term to itself. It reports overlapping hits,
+    so a hit only counts when it starts after the previous counted hit of the
+    same term ends, which is str.count's leftmost non-overlapping rule.
+    """
+    last_end = {}
+    total = 0
+    for end, term in automaton.iter(text):
+        if end - len(term) >= last_end.get(term, -1):
+            last_end[term] = end
+            total += 1
+    return total
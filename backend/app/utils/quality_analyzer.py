@@ -5,7 +5,104 @@ Evaluates scraped content quality and recommends actions
 from typing import Dict, List, Tuple
 from loguru import logger
 import re
-from collections import Counter
+from collections import Counter, OrderedDict
+import copy
+import hashlib
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# Character classes of every ASCII code point, for the byte histogram
+_ASCII_DIGIT = np.array([chr(i).isdigit() for i in range(128)])
+_ASCII_SPECIAL = np.array([not chr(i).isalnum() and not chr(i).isspace() for i in range(128)])
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
+# Common spam/error page markers, reported in this order. Ten separate substring
+# searches run in C and beat a single Aho-Corasick or alternation-regex sweep.
+_SPAM_INDICATORS = (
+    'cloudflare', 'enable javascript', 'cookie consent',
+    'access denied', '403', '404', 'error', 'captcha',
+    'please verify', 'not found'
+)
+
+# Recent analyze_content_quality results, keyed by content digest
+_CONTENT_ANALYSIS_CACHE: "OrderedDict[object, Dict]" = OrderedDict()
+_CONTENT_ANALYSIS_CACHE_SIZE = 256
+
+
+def _content_digest(content: str):
+    """Fast fingerprint of content for the analysis cache."""
+    data = content.encode('utf-8', 'surrogatepass')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh64(data).intdigest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False, nogil=True)
+    def _ascii_stats_kernel(codes, special_mask, digit_mask):
+        """_char_stats for ASCII bytes as a single compiled loop."""
+        special_chars = 0
+        digits = 0
+        max_repeat = 0
+        run = 0
+        prev = -1
+        for i in range(codes.shape[0]):
+            code = codes[i]
+            if special_mask[code]:
+                special_chars += 1
+            elif digit_mask[code]:
+                digits += 1
+            if code == prev:
+                run += 1
+            else:
+                run = 1
+                prev = code
+            if run > max_repeat:
+                max_repeat = run
+        return special_chars, digits, max_repeat
+
+
+def _char_stats(content: str) -> Tuple[int, int, int]:
+    """
+    (special_chars, digits, max_repeat) for content in one vectorized pass.
+    ASCII text is histogrammed byte-wise; anything else is counted per
+    distinct code point so str.isalnum/isdigit/isspace semantics are kept.
+    """
+    if content.isascii():
+        codes = np.frombuffer(content.encode('ascii'), dtype=np.uint8)
+        if NUMBA_AVAILABLE:
+            return _ascii_stats_kernel(codes, _ASCII_SPECIAL, _ASCII_DIGIT)
+        hist = np.bincount(codes, minlength=128)
+        special_chars = int(hist[_ASCII_SPECIAL].sum())
+        digits = int(hist[_ASCII_DIGIT].sum())
+    else:
+        codes = np.frombuffer(content.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        special_chars = digits = 0
+        for code, count in zip(*(a.tolist() for a in np.unique(codes, return_counts=True))):
+            char = chr(code)
+            if char.isdigit():
+                digits += count
+            if not char.isalnum() and not char.isspace():
+                special_chars += count
+    
+    # Longest run of one character: widest gap between positions where it changes
+    changes = np.flatnonzero(codes[1:] != codes[:-1])
+    edges = np.concatenate(([-1], changes, [len(codes) - 1]))
+    max_repeat = int(np.diff(edges).max())
+    
+    return special_chars, digits, max_repeat
 
 
 class DataQualityAnalyzer:
@@ -28,6 +125,25 @@ class DataQualityAnalyzer:
                 "reason": "insufficient_content"
             }
         
+        # The orchestrator scores the same raw page at several stages
+        cache_key = _content_digest(content)
+        cached = _CONTENT_ANALYSIS_CACHE.get(cache_key)
+        if cached is not None:
+            _CONTENT_ANALYSIS_CACHE.move_to_end(cache_key)
+            return copy.deepcopy(cached)
+        
+        result = DataQualityAnalyzer._score_content(content)
+        
+        # Cache a private copy so callers can mutate what they get back
+        _CONTENT_ANALYSIS_CACHE[cache_key] = copy.deepcopy(result)
+        if len(_CONTENT_ANALYSIS_CACHE) > _CONTENT_ANALYSIS_CACHE_SIZE:
+            _CONTENT_ANALYSIS_CACHE.popitem(last=False)
+        
+        return result
+    
+    @staticmethod
+    def _score_content(content: str) -> Dict[str, any]:
+        """Metrics and score for content of at least 100 characters."""
         metrics = {}
         score = 100  # Start with perfect score
         
@@ -51,7 +167,17 @@ class DataQualityAnalyzer:
             score -= 25
             metrics["word_count_penalty"] = -25
         
-        avg_word_length = sum(len(w) for w in words) / word_count if word_count > 0 else 0
+        # Word-level totals for checks 2, 7 and 10, gathered in one loop
+        total_word_length = 0
+        caps_words = 0
+        unique_words = set()
+        for w in words:
+            total_word_length += len(w)
+            if len(w) > 1 and w.isupper():
+                caps_words += 1
+            unique_words.add(w.lower())
+        
+        avg_word_length = total_word_length / word_count if word_count > 0 else 0
         metrics["avg_word_length"] = round(avg_word_length, 2)
         
         # Abnormal word lengths indicate garbage/base64/compressed data
@@ -60,19 +186,17 @@ class DataQualityAnalyzer:
             metrics["word_length_penalty"] = -40
         
         # 3. Sentence structure
-        sentences = re.split(r'[.!?]+', content)
-        sentence_count = len([s for s in sentences if len(s.strip()) > 10])
+        sentence_count = sum(1 for s in _SENTENCE_SPLIT_RE.split(content) if len(s.strip()) > 10)
         metrics["sentence_count"] = sentence_count
         
         if sentence_count < 5:
             score -= 15
             metrics["sentence_penalty"] = -15
         
+        # Character-level counts for checks 4-6, from one pass over content
+        special_chars, digits, max_repeat = _char_stats(content)
+        
         # 4. Repeated character detection (noise/garbage)
-        max_repeat = max(
-            (len(list(g)) for k, g in __import__('itertools').groupby(content)),
-            default=0
-        )
         metrics["max_char_repeat"] = max_repeat
         
         if max_repeat > 20:
@@ -80,7 +204,6 @@ class DataQualityAnalyzer:
             metrics["repeat_penalty"] = -30
         
         # 5. Special character ratio
-        special_chars = sum(1 for c in content if not c.isalnum() and not c.isspace())
         special_ratio = special_chars / length
         metrics["special_char_ratio"] = round(special_ratio, 3)
         
@@ -89,7 +212,7 @@ class DataQualityAnalyzer:
             metrics["special_char_penalty"] = -20
         
         # 6. Number vs text ratio
-        digit_ratio = sum(1 for c in content if c.isdigit()) / length
+        digit_ratio = digits / length
         metrics["digit_ratio"] = round(digit_ratio, 3)
         
         if digit_ratio > 0.5:  # Mostly numbers
@@ -98,7 +221,6 @@ class DataQualityAnalyzer:
         
         # 7. Capitalization ratio (all caps = shouting/garbage)
         if word_count > 0:
-            caps_words = sum(1 for w in words if w.isupper() and len(w) > 1)
             caps_ratio = caps_words / word_count
             metrics["caps_ratio"] = round(caps_ratio, 3)
             
@@ -106,8 +228,11 @@ class DataQualityAnalyzer:
                 score -= 15
                 metrics["caps_penalty"] = -15
         
+        # Lowercased once for the link and spam checks below
+        content_lower = content.lower()
+        
         # 8. Link density (too many links = spam)
-        link_count = content.lower().count('http')
+        link_count = content_lower.count('http://') + content_lower.count('https://')
         link_density = link_count / word_count if word_count > 0 else 0
         metrics["link_density"] = round(link_density, 3)
         
@@ -116,13 +241,7 @@ class DataQualityAnalyzer:
             metrics["link_density_penalty"] = -10
         
         # 9. Common spam/error indicators
-        spam_indicators = [
-            'cloudflare', 'enable javascript', 'cookie consent',
-            'access denied', '403', '404', 'error', 'captcha',
-            'please verify', 'not found'
-        ]
-        content_lower = content.lower()
-        spam_found = [ind for ind in spam_indicators if ind in content_lower]
+        spam_found = [ind for ind in _SPAM_INDICATORS if ind in content_lower]
         
         if spam_found:
             score -= 25
@@ -130,8 +249,7 @@ class DataQualityAnalyzer:
         
         # 10. Vocabulary richness (unique words / total words)
         if word_count > 50:
-            unique_words = len(set(w.lower() for w in words))
-            vocab_richness = unique_words / word_count
+            vocab_richness = len(unique_words) / word_count
             metrics["vocab_richness"] = round(vocab_richness, 3)
             
             if vocab_richness < 0.3:  # Too repetitive
@@ -186,11 +304,25 @@ class DataQualityAnalyzer:
             score -= 20
             metrics["count_penalty"] = -20
         
+        # Per-entity counts for checks 2-5, gathered in one pass
+        complete_entities = 0
+        entities_with_metadata = 0
+        entities_with_links = 0
+        titles = []
+        for e in entities:
+            title = e.get('title')
+            link = e.get('link')
+            metadata = e.get('metadata')
+            if title:
+                titles.append(title)
+                if link and e.get('context'):
+                    complete_entities += 1
+            if metadata and len(metadata) > 0:
+                entities_with_metadata += 1
+            if link and link.startswith('http'):
+                entities_with_links += 1
+        
         # 2. Completeness (entities with all fields)
-        complete_entities = sum(
-            1 for e in entities 
-            if e.get('title') and e.get('link') and e.get('context')
-        )
         completeness_ratio = complete_entities / entity_count
         metrics["completeness_ratio"] = round(completeness_ratio, 3)
         
@@ -199,8 +331,6 @@ class DataQualityAnalyzer:
             metrics["completeness_penalty"] = -25
         
         # 3. Title quality (check for meaningful titles)
-        titles = [e.get('title', '') for e in entities if e.get('title')]
-        
         if titles:
             avg_title_length = sum(len(t) for t in titles) / len(titles)
             metrics["avg_title_length"] = round(avg_title_length, 2)
@@ -222,10 +352,6 @@ class DataQualityAnalyzer:
                 metrics["duplicate_penalty"] = -20
         
         # 4. Metadata richness
-        entities_with_metadata = sum(
-            1 for e in entities 
-            if e.get('metadata') and len(e['metadata']) > 0
-        )
         metadata_ratio = entities_with_metadata / entity_count
         metrics["metadata_ratio"] = round(metadata_ratio, 3)
         
@@ -238,10 +364,6 @@ class DataQualityAnalyzer:
             metrics["metadata_penalty"] = -15
         
         # 5. Link validity
-        entities_with_links = sum(
-            1 for e in entities 
-            if e.get('link') and e['link'].startswith('http')
-        )
         link_ratio = entities_with_links / entity_count
         metrics["link_ratio"] = round(link_ratio, 3)
         
@@ -277,10 +399,11 @@ class DataQualityAnalyzer:
         POWER: Intelligent decision on whether to use LLM
         Saves tokens and time by skipping LLM when not needed
         """
-        # 1. If entities already good quality, skip LLM
-        entity_analysis = DataQualityAnalyzer.analyze_entity_quality(entities)
+        # Entity quality only matters to step 1 (20+ entities) and step 5
+        # (fewer than 20), so it is computed in whichever of them applies
         
-        if entity_analysis["quality_score"] >= 80 and len(entities) >= 20:
+        # 1. If entities already good quality, skip LLM
+        if len(entities) >= 20 and DataQualityAnalyzer.analyze_entity_quality(entities)["quality_score"] >= 80:
             return False, "sufficient_quality_entities"
         
         # 2. If content is low quality, LLM won't help
@@ -290,10 +413,9 @@ class DataQualityAnalyzer:
             return False, "low_quality_content"
         
         # 3. If content is structured enough (tables, lists), skip LLM
-        table_count = content.count('<table')
-        list_count = content.count('<ul') + content.count('<ol')
-        
-        if table_count > 5 or list_count > 10:
+        # Plain str.count passes beat a single '<(table|ul|ol)' regex scan,
+        # which stops at every tag; the list scans only run when tables fall short
+        if content.count('<table') > 5 or content.count('<ul') + content.count('<ol') > 10:
             return False, "sufficient_structure"
         
         # 4. Use LLM for complex unstructured content
@@ -301,7 +423,7 @@ class DataQualityAnalyzer:
             return True, "complex_content_needs_llm"
         
         # 5. Use LLM for medium quality with few entities
-        if entity_analysis["quality_score"] < 60 and len(entities) < 20:
+        if len(entities) < 20 and DataQualityAnalyzer.analyze_entity_quality(entities)["quality_score"] < 60:
             return True, "entities_need_enrichment"
         
         # Default: skip LLM to save resources
@@ -3,10 +3,56 @@ Smart schema detector - uses LLM to identify data type and structure accordingly
 """
 from typing import Dict, List, Any, Tuple
 from loguru import logger
+import functools
 import json
 import re
 from app.models.data_schemas import DataSchemaType, SCHEMA_MAP, StructuredDataResponse
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Field-name keyword groups and the score each adds per occurrence of a
+# matching field. A group counts once per field however many of its keywords hit.
+_FIELD_KEYWORD_GROUPS = (
+    (('company', 'industry', 'founded', 'revenue', 'employee'), ((DataSchemaType.COMPANY, 3),)),
+    (('price', 'brand', 'product', 'sku', 'stock', 'cart'), ((DataSchemaType.PRODUCT, 3),)),
+    (('author', 'publish', 'article', 'content', 'tag', 'category'), ((DataSchemaType.ARTICLE, 3),)),
+    (('salary', 'job', 'position', 'experience', 'apply', 'employer'), ((DataSchemaType.JOB, 3),)),
+    (('email', 'phone', 'linkedin', 'bio', 'profile'), ((DataSchemaType.PERSON, 3),)),
+    (('ingredient', 'cook', 'prep', 'cuisine', 'serving'), ((DataSchemaType.RECIPE, 3),)),
+    (('event', 'date', 'venue', 'organizer', 'ticket'), ((DataSchemaType.EVENT, 3),)),
+    (('review', 'rating', 'verified', 'helpful', 'pros', 'cons'), ((DataSchemaType.REVIEW, 3),)),
+    (('address', 'city', 'state', 'postal', 'latitude', 'longitude'), ((DataSchemaType.PLACE, 3),)),
+    # Universal fields add smaller scores
+    (('rating', 'review'), ((DataSchemaType.COMPANY, 1), (DataSchemaType.PRODUCT, 1), (DataSchemaType.PLACE, 1))),
+)
+
+# keyword -> indices of the groups it belongs to
+_KEYWORD_GROUPS: Dict[str, Tuple[int, ...]] = {}
+for _group, (_keywords, _) in enumerate(_FIELD_KEYWORD_GROUPS):
+    for _keyword in _keywords:
+        _KEYWORD_GROUPS[_keyword] = _KEYWORD_GROUPS.get(_keyword, ()) + (_group,)
+
+if AHOCORASICK_AVAILABLE:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _groups in _KEYWORD_GROUPS.items():
+        _KEYWORD_AUTOMATON.add_word(_keyword, _groups)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+
+@functools.lru_cache(maxsize=1024)
+def _field_groups(field: str) -> frozenset:
+    """
+    Indices of the keyword groups with at least one keyword inside field.
+    Memoized: scraped items reuse a small set of field names across calls.
+    """
+    if AHOCORASICK_AVAILABLE:
+        return frozenset(group for _, groups in _KEYWORD_AUTOMATON.iter(field) for group in groups)
+    return frozenset(group for keyword, groups in _KEYWORD_GROUPS.items() if keyword in field for group in groups)
+
 
 class SchemaDetector:
     """Detects data type and applies appropriate schema"""
@@ -39,13 +85,13 @@ class SchemaDetector:
                 # Detect value patterns
                 if value_str:
                     # Numeric patterns (prices, ratings, counts)
-                    if any(char in value_str for char in ['$', '€', '¥', '₹']):
+                    if '$' in value_str or '€' in value_str or '¥' in value_str or '₹' in value_str:
                         value_patterns['has_currency'] = value_patterns.get('has_currency', 0) + 1
                     # Rating patterns
-                    if any(word in value_str for word in ['star', 'rating', '/5', 'out of']):
+                    if 'star' in value_str or 'rating' in value_str or '/5' in value_str or 'out of' in value_str:
                         value_patterns['has_rating'] = value_patterns.get('has_rating', 0) + 1
                     # Location patterns
-                    if any(word in value_str for word in ['city', 'street', 'address', ',']):
+                    if ',' in value_str or 'city' in value_str or 'street' in value_str or 'address' in value_str:
                         value_patterns['has_location'] = value_patterns.get('has_location', 0) + 1
         
         # Calculate scores for each schema type based on field presence
@@ -61,41 +107,11 @@ class SchemaDetector:
             DataSchemaType.PLACE: 0,
         }
         
-        # Score based on field patterns
+        # Score based on field patterns: one keyword scan per field
         for field, count in field_patterns.items():
-            # Company indicators
-            if any(keyword in field for keyword in ['company', 'industry', 'founded', 'revenue', 'employee']):
-                schema_scores[DataSchemaType.COMPANY] += count * 3
-            # Product indicators  
-            if any(keyword in field for keyword in ['price', 'brand', 'product', 'sku', 'stock', 'cart']):
-                schema_scores[DataSchemaType.PRODUCT] += count * 3
-            # Article indicators
-            if any(keyword in field for keyword in ['author', 'publish', 'article', 'content', 'tag', 'category']):
-                schema_scores[DataSchemaType.ARTICLE] += count * 3
-            # Job indicators
-            if any(keyword in field for keyword in ['salary', 'job', 'position', 'experience', 'apply', 'employer']):
-                schema_scores[DataSchemaType.JOB] += count * 3
-            # Person indicators
-            if any(keyword in field for keyword in ['email', 'phone', 'linkedin', 'bio', 'profile']):
-                schema_scores[DataSchemaType.PERSON] += count * 3
-            # Recipe indicators
-            if any(keyword in field for keyword in ['ingredient', 'cook', 'prep', 'cuisine', 'serving']):
-                schema_scores[DataSchemaType.RECIPE] += count * 3
-            # Event indicators
-            if any(keyword in field for keyword in ['event', 'date', 'venue', 'organizer', 'ticket']):
-                schema_scores[DataSchemaType.EVENT] += count * 3
-            # Review indicators
-            if any(keyword in field for keyword in ['review', 'rating', 'verified', 'helpful', 'pros', 'cons']):
-                schema_scores[DataSchemaType.REVIEW] += count * 3
-            # Place indicators
-            if any(keyword in field for keyword in ['address', 'city', 'state', 'postal', 'latitude', 'longitude']):
-                schema_scores[DataSchemaType.PLACE] += count * 3
-            
-            # Universal fields add smaller scores
-            if any(keyword in field for keyword in ['rating', 'review']):
-                schema_scores[DataSchemaType.COMPANY] += count
-                schema_scores[DataSchemaType.PRODUCT] += count
-                schema_scores[DataSchemaType.PLACE] += count
+            for group in _field_groups(field):
+                for schema, weight in _FIELD_KEYWORD_GROUPS[group][1]:
+                    schema_scores[schema] += count * weight
         
         # Boost scores with value patterns
         if value_patterns.get('has_currency', 0) > 0:
@@ -133,33 +149,16 @@ class SchemaDetector:
         schema_class = SCHEMA_MAP[schema_type]
         schema_fields = schema_class.model_fields.keys()
         
+        # Smart field mapping based on schema type, resolved once for all items
+        mapper = SchemaDetector._MAPPERS.get(schema_type, SchemaDetector._map_generic)
+        
         structured_items = []
         
         for item in items:
             if not isinstance(item, dict):
                 continue
             
-            structured_item = {}
-            
-            # Smart field mapping based on schema type
-            if schema_type == DataSchemaType.COMPANY:
-                structured_item = SchemaDetector._map_company(item)
-            elif schema_type == DataSchemaType.PRODUCT:
-                structured_item = SchemaDetector._map_product(item)
-            elif schema_type == DataSchemaType.ARTICLE:
-                structured_item = SchemaDetector._map_article(item)
-            elif schema_type == DataSchemaType.JOB:
-                structured_item = SchemaDetector._map_job(item)
-            elif schema_type == DataSchemaType.PERSON:
-                structured_item = SchemaDetector._map_person(item)
-            else:
-                # Generic mapping
-                structured_item = {
-                    'title': item.get('title') or item.get('name') or item.get('text', 'Untitled'),
-                    'description': item.get('context') or item.get('description'),
-                    'url': item.get('link') or item.get('url'),
-                    'metadata': item.get('metadata', {})
-                }
+            structured_item = mapper(item)
             
             if structured_item:
                 structured_items.append(structured_item)
@@ -175,9 +174,10 @@ class SchemaDetector:
         
         metadata = item.get('metadata', {})
         for key, value in metadata.items():
-            if 'rating' in key.lower():
+            key_lower = key.lower()
+            if 'rating' in key_lower:
                 rating = value
-            elif 'review' in key.lower() or 'count' in key.lower():
+            elif 'review' in key_lower or 'count' in key_lower:
                 reviews_count = value
         
         # Parse context for industry/location
@@ -210,9 +210,10 @@ class SchemaDetector:
         rating = None
         
         for key, value in metadata.items():
-            if any(word in key.lower() for word in ['price', 'cost', 'amount']):
+            key_lower = key.lower()
+            if 'price' in key_lower or 'cost' in key_lower or 'amount' in key_lower:
                 price = value
-            elif 'rating' in key.lower():
+            elif 'rating' in key_lower:
                 rating = value
         
         return {
@@ -265,6 +266,25 @@ class SchemaDetector:
             'bio': item.get('context', '')[:200] if item.get('context') else None
         }
     
+    @staticmethod
+    def _map_generic(item: Dict) -> Dict:
+        """Map to generic schema"""
+        return {
+            'title': item.get('title') or item.get('name') or item.get('text', 'Untitled'),
+            'description': item.get('context') or item.get('description'),
+            'url': item.get('link') or item.get('url'),
+            'metadata': item.get('metadata', {})
+        }
+    
+    # Schema types with a dedicated mapper; everything else maps generically
+    _MAPPERS = {
+        DataSchemaType.COMPANY: _map_company,
+        DataSchemaType.PRODUCT: _map_product,
+        DataSchemaType.ARTICLE: _map_article,
+        DataSchemaType.JOB: _map_job,
+        DataSchemaType.PERSON: _map_person,
+    }
+    
     @staticmethod
     def create_structured_response(
         items: List[Dict], 
@@ -10,6 +10,16 @@ if sys.platform == 'win32':
     # CRITICAL: Force ProactorEventLoop for Playwright on Windows
     # This must run before ANY async loop is created
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    EVENT_LOOP = "asyncio"
+else:
+    # libuv-based loop: cheaper dispatch for the aiohttp-heavy profiler
+    # and scraper fan-out
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        EVENT_LOOP = "uvloop"
+    except ImportError:
+        EVENT_LOOP = "asyncio"
 
 import uvicorn
 
@@ -25,10 +35,12 @@ if __name__ == "__main__":
     print(f"🚀 Starting URWA Server (Windows Proactor Fix Applied)...")
     print(f"🔑 Groq Key Present: {bool(os.getenv('GROQ_API_KEY'))}")
     print(f"🌐 Server will run on {host}:{port}")
+    print(f"🔁 Event loop: {EVENT_LOOP}")
     
     uvicorn.run(
         "app.main:app", 
         host=host, 
         port=port, 
-        reload=False
+        reload=False,
+        loop=EVENT_LOOP
     )
@@ -0,0 +1,17 @@
+import sys
+import os
+
+# Ensure backend root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import context_manager
+from app.utils.context_manager import AdvancedContextManager
+
+
+def test_score_by_relevance_counts_terms_without_overlap(monkeypatch):
+    """Term frequency follows str.count on both the automaton and fallback paths"""
+    chunks = ["aaaa", "aa aa aa"]
+    for available in (context_manager.AHOCORASICK_AVAILABLE, False):
+        monkeypatch.setattr(context_manager, "AHOCORASICK_AVAILABLE", available)
+        scored = AdvancedContextManager._score_by_relevance(chunks, "aa")
+        assert scored["term_freq"].tolist() == [2, 3]
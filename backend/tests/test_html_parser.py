@@ -0,0 +1,37 @@
+import sys
+import os
+
+# Ensure backend root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.html_parser import EnhancedHTMLParser
+
+TEXT_CONTAINERS_HTML = (
+    "<body>Bare body text<pre>code block</pre><blockquote>quoted words</blockquote>"
+    "<dl><dt>Term</dt><dd>Definition</dd></dl><p>para</p>"
+    "<script>var x = 1;</script><nav><a href='/home'>Home</a></nav></body>"
+)
+
+
+def test_parse_keeps_text_outside_extractor_tags():
+    """Bare body text, pre, blockquote and dl/dt/dd must reach text_content"""
+    text = EnhancedHTMLParser.parse(TEXT_CONTAINERS_HTML, "https://example.com")["text_content"]
+    for piece in ("Bare body text", "code block", "quoted words", "Term", "Definition", "para"):
+        assert piece in text
+    assert "var x" not in text
+    assert "Home" not in text
+
+
+def test_parse_and_parse_fast_agree_on_text():
+    """Both entry points extract the same text"""
+    slow = EnhancedHTMLParser.parse(TEXT_CONTAINERS_HTML, "https://example.com")
+    fast = EnhancedHTMLParser.parse_fast(TEXT_CONTAINERS_HTML, "https://example.com")
+    assert slow["text_content"] == fast["text_content"]
+
+
+def test_dom_signature_counts_every_child():
+    """Child tags are ranked over all children, not just the leading ones"""
+    from bs4 import BeautifulSoup
+    html = "<ul class='jobs'>" + "<a></a>" * 20 + "<li></li>" * 40 + "</ul>"
+    element = BeautifulSoup(html, "html.parser").ul
+    assert EnhancedHTMLParser._get_dom_signature(element) == ("ul", "jobs", ">li", ">a")
@@ -0,0 +1,25 @@
+import sys
+import os
+
+# Ensure backend root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.html_parser_advanced import _ParseStore
+
+
+def test_parse_store_is_a_no_op_when_location_is_unusable(tmp_path):
+    """A cache path that cannot be created turns the store off instead of failing"""
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    store = _ParseStore(str(blocker / "cache" / "parse_cache.db"), ttl=60, max_rows=10)
+    store.save("digest", "https://example.com", {"text_content": "x"})
+    assert store.load("digest", "https://example.com") is None
+    assert store.persistence_file is None
+
+
+def test_parse_store_round_trips_results(tmp_path):
+    """Saved parses load back until they expire"""
+    store = _ParseStore(str(tmp_path / "parse_cache.db"), ttl=60, max_rows=10)
+    store.save("digest", "https://example.com", {"text_content": "x"})
+    assert store.load("digest", "https://example.com") == {"text_content": "x"}
+    assert store.load("digest", "https://other.example") is None
@@ -0,0 +1,51 @@
+import sys
+import os
+
+# Ensure backend root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.intelligent_ranker import IntelligentRanker
+
+
+def test_rank_entities_counts_long_queries_without_overlap():
+    """Long queries (automaton path) count terms like str.count: no overlapping hits"""
+    query = " ".join([f"filler{i}" for i in range(16)] + ["aa"])
+    entities = [
+        {"title": "x", "context": "aaaaaa"},      # 'aa' x3 non-overlapping
+        {"title": "y", "context": "aa aa aa aa"}  # 'aa' x4
+    ]
+    ranked = IntelligentRanker.rank_entities(entities, query)
+    assert [e["title"] for e in ranked] == ["y", "x"]
+
+
+def test_filter_by_quality_matches_spam_words_whole():
+    """Spam keywords drop a title only as whole words, in any case"""
+    titles = [
+        "Head of Sales", "Download the report", "Ad: great deal", "Click Here now",
+        "BUY NOW", "Advertisement", "Free ad inside", "ok", "", "é" * 10 + " title"
+    ]
+    kept = IntelligentRanker.filter_by_quality([{"title": t} for t in titles])
+    assert [e["title"] for e in kept] == ["Head of Sales", "Download the report"]
+
+
+def test_smart_pagination_detector_builds_next_page_urls():
+    """Next-page URLs for query and path pagination"""
+    detect = IntelligentRanker.smart_pagination_detector
+    
+    result = detect([], "https://example.com/list/page/3")
+    assert result["current_page"] == 3
+    assert result["next_page_url"] == "https://example.com/list/page/4"
+    
+    result = detect([], "https://example.com/search?q=x&page=2")
+    assert result["current_page"] == 2
+    assert result["next_page_url"] == "https://example.com/search?q=x&page=3"
+    
+    # page= outranks /page/ when a URL carries both
+    result = detect([], "https://example.com/page/7?page=2")
+    assert result["next_page_url"] == "https://example.com/page/7?page=3"
+    
+    # An explicit next link wins over URL rewriting
+    entities = [{"title": "Next", "link": "https://example.com/list?cursor=abc"}]
+    result = detect(entities, "https://example.com/list?page=1")
+    assert result["has_pagination"] is True
+    assert result["next_page_url"] == "https://example.com/list?cursor=abc"
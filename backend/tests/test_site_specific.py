@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Ensure backend root is in path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.strategies.site_specific import IndeedScraper
+
+RSS_ITEMS = (
+    "<item><title>Data Engineer{entity}Remote</title><link>https://www.indeed.com/viewjob?jk=1</link>"
+    "<source url='https://acme.example'>Acme</source></item>"
+    "<item><title>ML Engineer</title><link>https://www.indeed.com/viewjob?jk=2</link></item>"
+)
+
+
+def test_parse_rss_reads_well_formed_feed():
+    """Well-formed feeds are pull-parsed, with XML entities decoded"""
+    feed = "<?xml version='1.0'?><rss><channel>" + RSS_ITEMS.format(entity=" &amp; ") + "</channel></rss>"
+    jobs = IndeedScraper._parse_rss(feed)
+    assert jobs == [
+        {"title": "Data Engineer & Remote", "url": "https://www.indeed.com/viewjob?jk=1", "company": "Acme"},
+        {"title": "ML Engineer", "url": "https://www.indeed.com/viewjob?jk=2"},
+    ]
+
+
+def test_parse_rss_falls_back_on_html_entities():
+    """An HTML entity in the first item must not lose the feed"""
+    feed = "<rss><channel>" + RSS_ITEMS.format(entity="&nbsp;") + "</channel></rss>"
+    jobs = IndeedScraper._parse_rss(feed)
+    assert [job["title"] for job in jobs] == ["Data Engineer&nbsp;Remote", "ML Engineer"]
+    assert jobs[0]["company"] == "Acme"
+
+
+def test_first_successful_retrieves_losing_attempts():
+    """Failed and cancelled attempts are reaped, leaving no unretrieved exceptions"""
+    import asyncio
+    import gc
+    from app.strategies.site_specific import _first_successful
+    
+    unhandled = []
+    cleaned_up = []
+    
+    async def win():
+        return {"success": True, "source": "win"}
+    
+    async def fail():
+        raise RuntimeError("boom")
+    
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            cleaned_up.append("slow")
+    
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        outcome = await _first_successful({"Win": win(), "Fail": fail(), "Slow": slow()}, "Test")
+        assert cleaned_up == ["slow"]
+        gc.collect()
+        return outcome
+    
+    assert asyncio.run(main()) == {"success": True, "source": "win"}
+    assert unhandled == []